@@ -23,13 +23,21 @@ Output:
 
 import json
 import logging
+import multiprocessing
 import os
 import shutil
+import struct
 import sys
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 from datetime import datetime
 
 import numpy as np
@@ -48,6 +56,12 @@ logger = logging.getLogger(__name__)
 JOBS_DIR = Path(os.environ.get('JOBS_DIR', '/data/jobs'))
 MAPS_DIR = Path(os.environ.get('MAPS_DIR', '/data/maps'))
 SESSIONS_DIR = Path(os.environ.get('SESSIONS_DIR', '/data/sessions'))
+PACKS_DIR = Path(os.environ.get('PACKS_DIR', '/data/packs'))
+PACK_CODEC = os.environ.get('PACK_CODEC', 'none')  # none, zlib or lzf
+# Sessions whose raw cloud would exceed this are voxelized while they load
+STREAM_THRESHOLD_BYTES = int(os.environ.get('STREAM_THRESHOLD_BYTES', 2 * 1024 ** 3))
+SPILL_DIR = os.environ.get('SPILL_DIR')  # Out-of-core voxelizing scratch (None = system temp)
+EXTRINSICS_FILE = Path(os.environ.get('EXTRINSICS_FILE', '/app/config/extrinsics.json'))
 
 
 @dataclass
@@ -66,6 +80,34 @@ class SplatConfig:
     rotation_lr: float = 0.001
     opacity_lr: float = 0.05
     feature_lr: float = 0.0025
+    # Session ingest
+    load_workers: int = 0  # Threads for frame loading (0 = one per CPU)
+    deskew: bool = True  # Per-point motion compensation from PCD time offsets
+    # Skip frames that moved less than both thresholds since the last kept one
+    min_frame_translation: float = 0.05  # m (0 = keep every frame)
+    min_frame_rotation: float = 1.0  # degrees (0 = keep every frame)
+    # Sensor-frame crop, per frame before the world transform (0 / None = off)
+    min_range: float = 0.0  # m
+    max_range: float = 0.0  # m
+    min_height: Optional[float] = None  # m, sensor z
+    max_height: Optional[float] = None  # m, sensor z
+    ego_box: Optional[list[float]] = None  # [xmin, ymin, zmin, xmax, ymax, zmax], sensor frame
+    # Per-frame outlier rejection on range images, instead of on the merged cloud
+    range_image_filter: bool = False
+    range_image_columns: int = 1024  # Azimuth bins
+    range_image_rows: int = 64  # Elevation bins for frames without a ring column
+    range_image_remove_ground: bool = False
+    voxel_size: float = 0.05  # m
+    voxel_mode: str = 'first'  # Point kept per voxel: 'first', 'nearest' or 'centroid'
+    voxel_memory_mb: int = 0  # Voxelizing memory budget, spilling to disk past it (0 = unbounded)
+    # Merged-cloud outlier removal: 'statistical' (kNN distances, needs scipy) or 'radius'
+    outlier_mode: str = 'statistical'
+    outlier_radius: float = 0.2  # m, radius mode and the statistical mode's fallback
+    outlier_min_neighbors: int = 8  # Radius mode and the statistical mode's fallback
+    # Ground labels in the stats and the fallback PLY: 'plane' or 'tiled' (None = off)
+    ground_mode: Optional[str] = None
+    ground_tile_size: float = 10.0  # m, tiled mode
+    origin: str = 'first_pose'  # Local world origin: 'first_pose' or 'centroid'
 
 
 @dataclass 
@@ -96,424 +138,3670 @@ class Pose:
     rotation: np.ndarray  # [qx, qy, qz, qw] quaternion
 
 
-def load_poses(session_path: Path) -> list[Pose]:
+class PointBatch:
+    """
+    Columnar LiDAR points: one contiguous array per attribute.
+
+    xyz is always present; intensity, ring and time (seconds since the
+    first point of the frame) are None when the source did not carry them.
+    Indexing with a slice, mask or index array selects the same points from
+    every column, so stages can filter a batch exactly like an (N, 3) array.
+    """
+    __slots__ = ('xyz', 'intensity', 'ring', 'time')
+
+    # Column -> (dtype, per-point shape)
+    COLUMNS = {
+        'xyz': (np.float32, (3,)),
+        'intensity': (np.float32, ()),
+        'ring': (np.uint16, ()),
+        'time': (np.float32, ()),
+    }
+
+    def __init__(
+        self,
+        xyz: np.ndarray,
+        intensity: Optional[np.ndarray] = None,
+        ring: Optional[np.ndarray] = None,
+        time: Optional[np.ndarray] = None
+    ):
+        self.xyz = xyz
+        self.intensity = intensity
+        self.ring = ring
+        self.time = time
+
+    @classmethod
+    def allocate(cls, count: int, columns: Iterable[str] = ()) -> 'PointBatch':
+        """Allocate an uninitialized batch with xyz plus the given columns."""
+        arrays = {}
+        for name in {'xyz', *columns}:
+            dtype, shape = cls.COLUMNS[name]
+            arrays[name] = np.empty((count,) + shape, dtype=dtype)
+        return cls(**arrays)
+
+    @property
+    def columns(self) -> list[str]:
+        """Names of the columns present in this batch."""
+        return [name for name in self.__slots__ if getattr(self, name) is not None]
+
+    def __len__(self) -> int:
+        return len(self.xyz)
+
+    def __getitem__(self, index) -> 'PointBatch':
+        return PointBatch(**{name: getattr(self, name)[index] for name in self.columns})
+
+    def __setitem__(self, index, other: 'PointBatch'):
+        # Columns missing from other are zero-filled, extra ones dropped;
+        # columns other shares with self (same array) are left alone
+        for name in self.columns:
+            source = getattr(other, name)
+            target = getattr(self, name)
+            if source is not target:
+                target[index] = 0 if source is None else source
+
+
+def point_xyz(points: 'PointBatch | np.ndarray') -> np.ndarray:
+    """Positions of a PointBatch or a plain (N, 3) array."""
+    return points.xyz if isinstance(points, PointBatch) else points
+
+
+def read_csv_columns(path: Path, columns: int) -> tuple[np.ndarray, int]:
+    """
+    Read the first columns of a numeric CSV (with a header row) into an array.
+
+    Well-formed files (every row exactly `columns` numbers) are parsed in a
+    single np.fromstring call. Anything else falls back to parsing row by
+    row, skipping rows that are short or not numeric.
+
+    Returns:
+        (rows, columns) float64 array and the number of malformed rows skipped
+    """
+    data = path.read_bytes().replace(b'\r', b'')
+    body = data.split(b'\n', 1)[1].strip() if b'\n' in data else b''
+    if not body:
+        return np.zeros((0, columns)), 0
+
+    rows = body.count(b'\n') + 1
+    if body.count(b',') == rows * (columns - 1):
+        try:
+            values = np.fromstring(body.replace(b',', b' '), dtype=np.float64, sep=' ')
+        except ValueError:  # Non-numeric token
+            values = None
+        if values is not None and values.size == rows * columns:
+            return values.reshape(rows, columns), 0
+
+    values = []
+    malformed = 0
+    for line in body.split(b'\n'):
+        parts = line.split(b',')
+        if not line.strip():
+            continue
+        if len(parts) < columns:
+            malformed += 1
+            continue
+        try:
+            values.append([float(value) for value in parts[:columns]])
+        except ValueError:
+            malformed += 1
+    return np.array(values, dtype=np.float64).reshape(-1, columns), malformed
+
+
+def load_poses(session_path: Path) -> 'PoseTrack':
     """
     Load poses from poses.csv file.
     
     Format: timestamp_secs,x,y,z,qx,qy,qz,qw
     """
-    poses_file = session_path / 'poses.csv'
-    poses = []
+    poses_file = session_path / 'poses.csv'
+    
+    if not poses_file.exists():
+        logger.warning(f"No poses.csv found at {poses_file}")
+        return PoseTrack.empty()
+    
+    rows, malformed = read_csv_columns(poses_file, 8)
+    if malformed:
+        logger.warning(f"Skipped {malformed} malformed rows in {poses_file}")
+    
+    logger.info(f"Loaded {len(rows)} poses from poses.csv")
+    return PoseTrack.from_array(rows)
+
+
+@dataclass
+class PoseTrack:
+    """
+    A pose trajectory as contiguous arrays.
+
+    Lookups are batched: a whole vector of timestamps is answered with one
+    np.searchsorted, so interpolating M timestamps costs O(M log P) however
+    long the trajectory is.
+    """
+    timestamps: np.ndarray  # (P,) float64, ascending
+    positions: np.ndarray  # (P, 3) float64
+    rotations: np.ndarray  # (P, 4) float64 [qx, qy, qz, qw], unit length
+
+    @classmethod
+    def empty(cls) -> 'PoseTrack':
+        return cls.from_array(np.zeros((0, 8)))
+
+    @classmethod
+    def from_array(cls, rows: np.ndarray) -> 'PoseTrack':
+        """
+        Build a track from (P, 8) rows of timestamp, x, y, z, qx, qy, qz, qw.
+
+        Rows are sorted by timestamp and quaternions normalized.
+        """
+        if len(rows) and np.any(np.diff(rows[:, 0]) < 0):
+            rows = rows[np.argsort(rows[:, 0], kind='stable')]
+        rotations = rows[:, 4:8].copy()
+        norms = np.linalg.norm(rotations, axis=1, keepdims=True)
+        np.divide(rotations, norms, out=rotations, where=norms > 0)
+        return cls(
+            timestamps=np.ascontiguousarray(rows[:, 0]),
+            positions=np.ascontiguousarray(rows[:, 1:4]),
+            rotations=rotations,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def relative_to(self, origin: np.ndarray) -> 'PoseTrack':
+        """The same trajectory with positions relative to origin."""
+        return PoseTrack(self.timestamps, self.positions - origin, self.rotations)
+
+    def interpolate(self, timestamps: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate poses at many timestamps at once.
+
+        Positions are blended linearly and rotations with SLERP, taking the
+        shorter arc (q and -q are the same rotation). Timestamps outside the
+        track are clamped to its first / last pose.
+
+        Args:
+            timestamps: (M,) array of timestamps
+
+        Returns:
+            positions: (M, 3) array
+            rotations: (M, 4) array of unit quaternions
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        last = len(self.timestamps) - 1
+
+        # Bracketing poses: prev is the last pose at or before t
+        i = np.searchsorted(self.timestamps, timestamps, side='right')
+        prev = np.clip(i - 1, 0, last)
+        next_ = np.clip(i, 0, last)
+
+        dt = self.timestamps[next_] - self.timestamps[prev]
+        t = np.divide(timestamps - self.timestamps[prev], dt,
+                      out=np.zeros_like(dt), where=dt >= 1e-6)
+        np.clip(t, 0.0, 1.0, out=t)
+
+        positions = self.positions[prev] * (1 - t)[:, None] + self.positions[next_] * t[:, None]
+
+        q0 = self.rotations[prev]
+        q1 = self.rotations[next_]
+        dot = np.einsum('ij,ij->i', q0, q1)
+        q1 = np.where(dot[:, None] < 0, -q1, q1)
+        theta = np.arccos(np.clip(np.abs(dot), 0.0, 1.0))
+        sin_theta = np.sin(theta)
+        # Nearly identical rotations: SLERP weights are 0/0, lerp instead
+        small = sin_theta < 1e-6
+        sin_theta[small] = 1.0
+        w0 = np.where(small, 1 - t, np.sin((1 - t) * theta) / sin_theta)
+        w1 = np.where(small, t, np.sin(t * theta) / sin_theta)
+
+        rotations = q0 * w0[:, None] + q1 * w1[:, None]
+        rotations /= np.linalg.norm(rotations, axis=1, keepdims=True)
+        return positions, rotations
+
+    def matrices(self, timestamps: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate poses as rotation matrices.
+
+        Returns:
+            positions: (M, 3) array
+            rotations: (M, 3, 3) array of rotation matrices
+        """
+        positions, rotations = self.interpolate(timestamps)
+        return positions, quaternions_to_matrices(rotations)
+
+    def pose_at(self, timestamp: float) -> Optional[Pose]:
+        """Interpolate a single pose, or None if the track is empty."""
+        if len(self) == 0:
+            return None
+        positions, rotations = self.interpolate(np.array([timestamp]))
+        return Pose(timestamp=timestamp, position=positions[0], rotation=rotations[0])
+
+
+def session_origin(track: PoseTrack, mode: str = 'first_pose') -> np.ndarray:
+    """
+    Pick a local origin for a session's world frame.
+
+    World points are kept in float32 relative to this origin; absolute
+    (odometry/map) coordinates would lose centimetres in float32 a few km
+    from the map origin.
+
+    Args:
+        track: Pose trajectory
+        mode: 'first_pose' (rover start position) or 'centroid' (mean
+            trajectory position, smallest coordinates for long sessions)
+
+    Returns:
+        (3,) float64 origin; zero if there are no poses
+    """
+    if len(track) == 0:
+        return np.zeros(3)
+    if mode == 'first_pose':
+        return track.positions[0].copy()
+    if mode == 'centroid':
+        return track.positions.mean(axis=0)
+    raise ValueError(f"Unknown origin mode: {mode}")
+
+
+def quaternions_to_matrices(q: np.ndarray) -> np.ndarray:
+    """Convert (M, 4) quaternions [qx, qy, qz, qw] to (M, 3, 3) rotation matrices."""
+    qx, qy, qz, qw = q.T
+    R = np.empty((len(q), 3, 3))
+    R[:, 0, 0] = 1 - 2*qy*qy - 2*qz*qz
+    R[:, 0, 1] = 2*qx*qy - 2*qz*qw
+    R[:, 0, 2] = 2*qx*qz + 2*qy*qw
+    R[:, 1, 0] = 2*qx*qy + 2*qz*qw
+    R[:, 1, 1] = 1 - 2*qx*qx - 2*qz*qz
+    R[:, 1, 2] = 2*qy*qz - 2*qx*qw
+    R[:, 2, 0] = 2*qx*qz - 2*qy*qw
+    R[:, 2, 1] = 2*qy*qz + 2*qx*qw
+    R[:, 2, 2] = 1 - 2*qx*qx - 2*qy*qy
+    return R
+
+
+def quaternion_to_matrix(q: np.ndarray) -> np.ndarray:
+    """Convert quaternion [qx, qy, qz, qw] to 3x3 rotation matrix."""
+    return quaternions_to_matrices(np.asarray(q, dtype=np.float64)[None])[0]
+
+
+def quaternion_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Hamilton product a * b of [qx, qy, qz, qw] quaternions (broadcasts over rows)."""
+    ax, ay, az, aw = np.moveaxis(np.asarray(a), -1, 0)
+    bx, by, bz, bw = np.moveaxis(np.asarray(b), -1, 0)
+    return np.stack([
+        aw*bx + ax*bw + ay*bz - az*by,
+        aw*by - ax*bz + ay*bw + az*bx,
+        aw*bz + ax*by - ay*bx + az*bw,
+        aw*bw - ax*bx - ay*by - az*bz,
+    ], axis=-1)
+
+
+# =============================================================================
+# Sensor Extrinsics
+# =============================================================================
+
+# Uncalibrated rovers: identity, as recordings may already hold points in
+# the rover frame and applying a guessed mount would shift them twice
+DEFAULT_LIDAR_TO_BASE = {'rotation': [0.0, 0.0, 0.0, 1.0], 'translation': [0.0, 0.0, 0.0]}
+
+
+@dataclass
+class Extrinsics:
+    """A rigid sensor mount: sensor frame -> parent (base_link) frame."""
+    rotation: np.ndarray  # [qx, qy, qz, qw]
+    translation: np.ndarray  # [x, y, z] meters
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Extrinsics':
+        """Parse {"rotation": [qx, qy, qz, qw], "translation": [x, y, z]}."""
+        rotation = np.asarray(data.get('rotation', [0.0, 0.0, 0.0, 1.0]), dtype=np.float64)
+        translation = np.asarray(data.get('translation', [0.0, 0.0, 0.0]), dtype=np.float64)
+        if rotation.shape != (4,) or translation.shape != (3,) or not np.linalg.norm(rotation) > 0:
+            raise ValueError(f"Invalid extrinsics: {data}")
+        return cls(rotation=rotation / np.linalg.norm(rotation), translation=translation)
+
+    def compose(
+        self,
+        positions: np.ndarray,
+        rotations: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Chain world <- base_link poses with this mount into world <- sensor poses.
+
+        Applying the composed pose is one rigid transform per point instead
+        of one for the mount and another for the pose.
+
+        Args:
+            positions: (M, 3) base_link positions
+            rotations: (M, 4) base_link unit quaternions
+
+        Returns:
+            (positions, rotations) of the sensor
+        """
+        translation = np.broadcast_to(self.translation, positions.shape)
+        return (
+            positions + rotate_by_quaternions(translation, rotations),
+            quaternion_multiply(rotations, self.rotation),
+        )
+
+
+@lru_cache(maxsize=None)
+def load_extrinsics_config(path: Path) -> dict:
+    """
+    Load the per-rover extrinsics file, once per worker.
+
+    Format: {"<rover_id>": {"lidar_to_base": {"rotation": [...],
+    "translation": [...]}}}, one entry per calibrated rover
+    """
+    if not path.exists():
+        logger.warning(f"No extrinsics config at {path}; rovers without an entry use "
+                       f"identity lidar->base_link")
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load extrinsics config {path}: {e}")
+        return {}
+
+
+@lru_cache(maxsize=None)
+def rover_lidar_extrinsics(rover_id: Optional[str]) -> Extrinsics:
+    """lidar -> base_link mount for a rover (calibrated entry, else identity)."""
+    config = load_extrinsics_config(EXTRINSICS_FILE)
+    entry = config.get(rover_id) if rover_id is not None else None
+    if not entry or 'lidar_to_base' not in entry:
+        # Cached per rover, so this logs once
+        logger.warning(f"No calibrated LiDAR extrinsics for rover {rover_id or 'unknown'}, "
+                       f"using identity")
+        return Extrinsics.from_dict(DEFAULT_LIDAR_TO_BASE)
+    return Extrinsics.from_dict(entry['lidar_to_base'])
+
+
+def session_rover_id(session_path: Path) -> Optional[str]:
+    """Rover that recorded a session, from metadata.json."""
+    try:
+        with open(session_path / 'metadata.json', 'r') as f:
+            return json.load(f).get('rover_id')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def session_lidar_extrinsics(session_path: Path) -> Extrinsics:
+    """lidar -> base_link mount for the rover that recorded a session."""
+    rover_id = session_rover_id(session_path)
+    extrinsics = rover_lidar_extrinsics(rover_id)
+    logger.info(f"LiDAR extrinsics for rover {rover_id or 'unknown'}: "
+                f"translation {extrinsics.translation.tolist()}, "
+                f"rotation {extrinsics.rotation.tolist()}")
+    return extrinsics
+
+
+def transform_points_to_world(
+    points: np.ndarray,
+    pose: Pose,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Transform points from sensor frame to world frame using pose.
+    
+    Args:
+        points: (N, 3) array of points in sensor frame
+        pose: Pose with position and rotation
+        out: Optional (N, 3) array to write the result into (default: a
+            new float32 array, so pose positions should be local, see
+            session_origin)
+    
+    Returns:
+        (N, 3) array of points in world frame
+    """
+    if len(points) == 0:
+        return points
+    
+    # Build rotation matrix from quaternion
+    R = quaternion_to_matrix(pose.rotation)
+    
+    # Transform: world_point = R @ sensor_point + position
+    if out is None:
+        out = np.empty(points.shape, dtype=np.float32)
+    
+    np.matmul(points, R.T, out=out)
+    out += pose.position
+    return out
+
+
+def rotate_by_quaternions(points: np.ndarray, rotations: np.ndarray) -> np.ndarray:
+    """
+    Rotate each point by its own quaternion.
+
+    Uses v' = v + w*t + q x t with t = 2 * (q x v), which is cheaper than
+    building a 3x3 matrix per point.
+
+    Args:
+        points: (N, 3) array
+        rotations: (N, 4) array of unit quaternions [qx, qy, qz, qw]
+
+    Returns:
+        (N, 3) array of rotated points
+    """
+    q = rotations[:, :3]
+    t = 2.0 * np.cross(q, points)
+    return points + rotations[:, 3:] * t + np.cross(q, t)
+
+
+def deskew_points(
+    points: np.ndarray,
+    point_times: np.ndarray,
+    timestamp: float | np.ndarray,
+    track: PoseTrack,
+    out: Optional[np.ndarray] = None,
+    extrinsics: Optional[Extrinsics] = None
+) -> np.ndarray:
+    """
+    Transform points to world frame with a pose per point.
+
+    A spinning LiDAR sweeps for ~100 ms per frame; at speed, a single frame
+    pose smears the cloud. Each point is instead placed with the pose
+    interpolated at its own capture time.
+
+    Args:
+        points: (N, 3) array of points in sensor frame
+        point_times: (N,) time offsets in seconds from the first point
+        timestamp: Frame timestamp (capture time of the first point), or
+            an (N,) array of them for points from several frames
+        track: Pose trajectory
+        out: Optional (N, 3) array to write the result into (default: a
+            new float32 array)
+        extrinsics: Sensor mount, composed with each point's pose
+
+    Returns:
+        (N, 3) array of points in world frame
+    """
+    if len(points) == 0:
+        return points
+
+    positions, rotations = track.interpolate(timestamp + point_times.astype(np.float64))
+    if extrinsics is not None:
+        positions, rotations = extrinsics.compose(positions, rotations)
+    world = rotate_by_quaternions(points.astype(np.float64), rotations)
+    world += positions
+
+    if out is None:
+        out = np.empty(points.shape, dtype=np.float32)
+    out[:] = world
+    return out
+
+
+TRANSFORM_CHUNK_POINTS = 1 << 20  # Bounds per-point rotation temporaries
+
+
+def transform_frames_to_world(
+    points: PointBatch,
+    offsets: np.ndarray,
+    timestamps: np.ndarray,
+    track: PoseTrack,
+    deskew: bool = False,
+    workers: int = 0,
+    chunk_size: int = TRANSFORM_CHUNK_POINTS,
+    extrinsics: Optional[Extrinsics] = None
+):
+    """
+    Transform a buffer of concatenated sensor-frame frames to world frame, in place.
+
+    Pose interpolation, composition with the sensor mount and matrix
+    construction run once for all frames. Each frame is then one in-place
+    BLAS product over its contiguous segment through a reused scratch
+    buffer, so nothing is allocated per frame. (Gathering a matrix per point
+    for a single einsum is ~5x slower than per-segment matmul.) With deskew,
+    every point gets its own pose instead, chunk_size points at a time. Work
+    runs on the thread pool.
+
+    Frames with an unknown (NaN) timestamp are left in sensor frame.
+
+    Args:
+        points: Frames concatenated in order; xyz is updated in place
+        offsets: (F + 1,) start row of each frame
+        timestamps: (F,) frame timestamps, NaN if unknown
+        track: Pose trajectory
+        deskew: Use a pose per point when points carry time offsets
+        workers: Threads (0 = one per CPU)
+        chunk_size: Points per chunk
+        extrinsics: Sensor mount (sensor -> pose frame), if any
+    """
+    if len(track) == 0 or len(points) == 0:
+        return
+
+    known = ~np.isnan(timestamps)
+    counts = np.diff(offsets)
+    xyz = points.xyz
+
+    if deskew and points.time is not None:
+        frame_index = np.repeat(np.arange(len(timestamps)), counts)
+
+        def transform_chunk(start: int):
+            end = min(start + chunk_size, len(xyz))
+            index = frame_index[start:end]
+            if known[index].all():
+                deskew_points(xyz[start:end], points.time[start:end],
+                              timestamps[index], track, out=xyz[start:end],
+                              extrinsics=extrinsics)
+            else:
+                rows = start + np.flatnonzero(known[index])
+                xyz[rows] = deskew_points(xyz[rows], points.time[rows],
+                                          timestamps[frame_index[rows]], track,
+                                          extrinsics=extrinsics)
+
+        chunks = range(0, len(xyz), chunk_size)
+    else:
+        frames = np.flatnonzero(known & (counts > 0))
+        positions, quaternions = track.interpolate(timestamps[frames])
+        if extrinsics is not None:
+            positions, quaternions = extrinsics.compose(positions, quaternions)
+        matrices = quaternions_to_matrices(quaternions)
+        rotations = matrices.transpose(0, 2, 1).astype(xyz.dtype)  # Row vectors: p @ R.T
+        translations = positions.astype(xyz.dtype)
+
+        def transform_chunk(group: np.ndarray):
+            scratch = np.empty((counts[frames[group]].max(), 3), dtype=xyz.dtype)
+            for j in group:
+                segment = xyz[offsets[frames[j]]:offsets[frames[j] + 1]]
+                product = scratch[:len(segment)]
+                np.matmul(segment, rotations[j], out=product)
+                np.add(product, translations[j], out=segment)
+
+        # Groups of whole frames, about chunk_size points each
+        ends = np.cumsum(counts[frames])
+        splits = np.searchsorted(ends, np.arange(chunk_size, ends[-1] if len(ends) else 0, chunk_size))
+        chunks = [group for group in np.split(np.arange(len(frames)), np.unique(splits)) if len(group)]
+
+    for _ in map_ordered(transform_chunk, chunks, workers):
+        pass
+
+
+def load_frame_timestamps(timestamps_file: Path) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Load frame timestamps from a sensor's timestamps.csv.
+
+    Format: frame,timestamp_secs
+
+    Returns:
+        (frame_nums, timestamps) as int64 / float64 arrays in file order
+    """
+    if not timestamps_file.exists():
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    
+    rows, malformed = read_csv_columns(timestamps_file, 2)
+    frame_nums = rows[:, 0].astype(np.int64)
+    valid = (frame_nums >= 0) & (frame_nums == rows[:, 0])
+    malformed += int(np.count_nonzero(~valid))
+    if malformed:
+        logger.warning(f"Skipped {malformed} malformed rows in {timestamps_file}")
+    
+    return frame_nums[valid], rows[valid, 1]
+
+
+def load_lidar_timestamps(lidar_dir: Path) -> np.ndarray:
+    """
+    Load LiDAR frame timestamps from lidar/timestamps.csv.
+
+    Returns:
+        Timestamps indexed by frame number, NaN for frames not listed
+        (see frame_timestamps)
+    """
+    frame_nums, timestamps = load_frame_timestamps(lidar_dir / 'timestamps.csv')
+    table = np.full(frame_nums.max() + 1 if len(frame_nums) else 0, np.nan)
+    table[frame_nums] = timestamps
+    return table
+
+
+def load_camera_timestamps(camera_dir: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Load camera (frame_nums, timestamps) from camera/timestamps.csv."""
+    return load_frame_timestamps(camera_dir / 'timestamps.csv')
+
+
+def frame_timestamps(table: np.ndarray, frame_nums: Iterable[int]) -> np.ndarray:
+    """Look up frame timestamps in a load_lidar_timestamps table; NaN if unknown."""
+    frame_nums = np.fromiter(frame_nums, dtype=np.int64)
+    timestamps = np.full(len(frame_nums), np.nan)
+    known = (frame_nums >= 0) & (frame_nums < len(table))
+    timestamps[known] = table[frame_nums[known]]
+    return timestamps
+
+
+def optional_timestamp(timestamp: float) -> Optional[float]:
+    """NaN (unknown) timestamp to None."""
+    return None if np.isnan(timestamp) else float(timestamp)
+
+
+@dataclass
+class SensorCrop:
+    """
+    Per-frame crop in sensor coordinates.
+
+    Drops near-field noise and returns from the rover itself (ego_box) and
+    far points useless for a sidewalk map, before they are transformed,
+    merged or voxelized. Each limit is off when 0 / None.
+    """
+    min_range: float = 0.0
+    max_range: float = 0.0
+    min_height: Optional[float] = None
+    max_height: Optional[float] = None
+    ego_box: Optional[list[float]] = None  # [xmin, ymin, zmin, xmax, ymax, zmax]
+
+    @classmethod
+    def from_config(cls, config: SplatConfig) -> Optional['SensorCrop']:
+        """The crop a job configures, or None if every limit is off."""
+        crop = cls(
+            min_range=config.min_range,
+            max_range=config.max_range,
+            min_height=config.min_height,
+            max_height=config.max_height,
+            ego_box=config.ego_box,
+        )
+        return crop if crop.enabled else None
+
+    @property
+    def enabled(self) -> bool:
+        return (self.min_range > 0 or self.max_range > 0 or self.min_height is not None
+                or self.max_height is not None or self.ego_box is not None)
+
+    def mask(self, xyz: np.ndarray) -> np.ndarray:
+        """(N,) bool mask of sensor-frame points to keep."""
+        keep = np.ones(len(xyz), dtype=bool)
+        if self.min_range > 0 or self.max_range > 0:
+            range_sq = np.einsum('ij,ij->i', xyz, xyz)
+            if self.min_range > 0:
+                keep &= range_sq >= self.min_range ** 2
+            if self.max_range > 0:
+                keep &= range_sq <= self.max_range ** 2
+        if self.min_height is not None:
+            keep &= xyz[:, 2] >= self.min_height
+        if self.max_height is not None:
+            keep &= xyz[:, 2] <= self.max_height
+        if self.ego_box is not None:
+            low, high = np.asarray(self.ego_box[:3]), np.asarray(self.ego_box[3:])
+            keep &= ~np.all((xyz >= low) & (xyz <= high), axis=1)
+        return keep
+
+    def apply(self, batch: PointBatch) -> PointBatch:
+        return batch[self.mask(batch.xyz)]
+
+
+def motion_gate(
+    timestamps: np.ndarray,
+    track: PoseTrack,
+    min_translation: float,
+    min_rotation: float
+) -> np.ndarray:
+    """
+    Select the frames the rover moved enough for since the last kept frame.
+
+    A frame is skipped when the pose moved less than min_translation AND
+    turned less than min_rotation since the last kept frame, so a parked
+    rover contributes one frame instead of hundreds of near-duplicates.
+    Only poses and timestamps are used, so skipped frames are never read.
+
+    Args:
+        timestamps: (F,) frame timestamps in frame order, NaN if unknown
+            (always kept)
+        track: Pose trajectory
+        min_translation: Meters (<= 0 disables the gate)
+        min_rotation: Degrees (<= 0 disables the gate)
+
+    Returns:
+        (F,) bool keep mask
+    """
+    keep = np.ones(len(timestamps), dtype=bool)
+    if len(track) == 0 or min_translation <= 0 or min_rotation <= 0:
+        return keep
+
+    known = np.flatnonzero(~np.isnan(timestamps))
+    positions, rotations = track.interpolate(timestamps[known])
+
+    # Sequential by nature (depends on the last kept frame): plain floats
+    min_distance_sq = min_translation ** 2
+    min_cos = np.cos(np.radians(min_rotation) / 2)  # |q1 . q2| = cos(angle / 2)
+    positions = positions.tolist()
+    rotations = rotations.tolist()
+    last = 0
+    for j in range(1, len(known)):
+        (x, y, z), (lx, ly, lz) = positions[j], positions[last]
+        q, lq = rotations[j], rotations[last]
+        distance_sq = (x - lx) ** 2 + (y - ly) ** 2 + (z - lz) ** 2
+        cos = abs(q[0] * lq[0] + q[1] * lq[1] + q[2] * lq[2] + q[3] * lq[3])
+        if distance_sq < min_distance_sq and cos > min_cos:
+            keep[known[j]] = False
+        else:
+            last = j
+
+    logger.info(f"Motion gate kept {np.count_nonzero(keep)}/{len(keep)} LiDAR frames")
+    return keep
+
+
+def map_ordered(fn: Callable, items: Iterable, workers: int = 0) -> Iterator:
+    """
+    Apply fn to items on a thread pool, yielding results in input order.
+
+    At most 2 * workers items are in flight, so a slow consumer bounds how
+    far the pool runs ahead (and how many results are held in memory).
+
+    Args:
+        fn: Function to apply
+        items: Inputs
+        workers: Threads (0 = one per CPU, 1 = run inline)
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(fn, items)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(pool.submit(fn, item))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Consumer stopped early: drop work that has not started
+            for future in pending:
+                future.cancel()
+
+
+def frame_to_world(
+    batch: PointBatch,
+    timestamp: Optional[float],
+    track: PoseTrack,
+    out: Optional[PointBatch] = None,
+    deskew: bool = False,
+    extrinsics: Optional[Extrinsics] = None,
+    crop: Optional[SensorCrop] = None,
+    range_filter: Optional['RangeImageFilter'] = None
+) -> PointBatch:
+    """
+    Transform one sensor-frame LiDAR frame into the world frame.
+
+    Frames without a timestamp or pose are returned in the sensor frame.
+    With deskew on and per-point times in the frame, every point is
+    transformed with its own pose instead of the single frame pose.
+
+    Args:
+        batch: Frame points in sensor frame
+        timestamp: Frame timestamp for pose interpolation
+        track: Pose trajectory
+        out: Optional batch of at least len(batch) rows; the result is
+            written into its leading rows (attributes out lacks are dropped)
+        deskew: Enable per-point deskew
+        extrinsics: Sensor mount (sensor -> pose frame), if any
+        crop: Sensor-frame crop, applied before the transform
+        range_filter: Range-image filter, applied after the crop
+
+    Returns:
+        World-frame points (a view of out if given)
+    """
+    if crop is not None:
+        batch = crop.apply(batch)
+    if range_filter is not None:
+        batch = range_filter.apply(batch)
+
+    pose = track.pose_at(timestamp) if timestamp is not None else None
+    if pose is not None and extrinsics is not None:
+        position, rotation = extrinsics.compose(pose.position[None], pose.rotation[None])
+        pose = Pose(timestamp=timestamp, position=position[0], rotation=rotation[0])
+    if pose is None and out is None:
+        return batch
+
+    if out is None:
+        out = PointBatch.allocate(len(batch), batch.columns)
+    else:
+        out = out[:len(batch)]
+
+    if pose is not None:
+        # Positions go through the pose transform, attributes are copied
+        if deskew and batch.time is not None:
+            deskew_points(batch.xyz, batch.time, timestamp, track, out=out.xyz,
+                          extrinsics=extrinsics)
+        else:
+            transform_points_to_world(batch.xyz, pose, out=out.xyz)
+        batch = PointBatch(out.xyz, batch.intensity, batch.ring, batch.time)
+    out[:] = batch
+    return out
+
+
+def load_world_frame(
+    frame: 'LidarFrame',
+    timestamp: Optional[float],
+    track: PoseTrack,
+    out: Optional[PointBatch] = None,
+    deskew: bool = False,
+    extrinsics: Optional[Extrinsics] = None,
+    crop: Optional[SensorCrop] = None,
+    range_filter: Optional['RangeImageFilter'] = None
+) -> Optional[PointBatch]:
+    """
+    Load one LiDAR frame from its PCD and transform it into the world frame.
+
+    See frame_to_world for the arguments.
+
+    Returns:
+        World-frame points, or None if the frame has no valid points
+    """
+    batch = load_pcd(frame.path, frame.header)
+    if batch is None:
+        return None
+    return frame_to_world(batch, timestamp, track, out, deskew, extrinsics, crop, range_filter)
+
+
+def iter_session_frames(
+    session_path: Path,
+    workers: int = 0,
+    deskew: bool = True,
+    origin: str = 'first_pose',
+    min_translation: float = 0.0,
+    min_rotation: float = 0.0,
+    crop: Optional[SensorCrop] = None,
+    range_filter: Optional['RangeImageFilter'] = None
+) -> Iterator[tuple[int, Optional[float], PointBatch]]:
+    """
+    Stream a session's LiDAR frames in world frame, one frame at a time.
+
+    Frames are loaded on a small thread pool a few frames ahead of the
+    consumer, so memory stays bounded by the pool, not the session.
+    Frames without valid points are skipped. A session pack is read
+    instead of the PCD files when one exists.
+
+    Args:
+        session_path: Session directory
+        workers: Frame loading threads (0 = one per CPU)
+        deskew: Transform each point with its own pose when frames carry
+            per-point times
+        origin: Local origin mode (see session_origin)
+        min_translation: Motion gate translation threshold, meters
+        min_rotation: Motion gate rotation threshold, degrees
+        crop: Sensor-frame crop applied to every frame before the transform
+        range_filter: Per-frame range-image filter, applied after the crop
+
+    Yields:
+        (frame_num, timestamp, world_points) with world_points a float32
+        PointBatch relative to the session origin;
+        timestamp is None (and points stay in sensor frame) for frames
+        missing from lidar/timestamps.csv
+    """
+    extrinsics = session_lidar_extrinsics(session_path)
+    pack = open_session_pack(session_path)
+    if pack is not None:
+        track = pack.pose_track()
+        track = track.relative_to(session_origin(track, origin))
+        frame_nums, timestamps, offsets = pack.frame_index()
+        keep = motion_gate(timestamps, track, min_translation, min_rotation)
+
+        def load_chunk(chunk: int) -> list[tuple[int, Optional[float], PointBatch]]:
+            start, end = pack.chunk_frames(chunk)
+            if not keep[start:end].any():
+                return []
+            batch = pack.read_chunk(chunk)
+            base = offsets[start]
+            frames = []
+            for i in np.flatnonzero(keep[start:end]) + start:
+                timestamp = optional_timestamp(timestamps[i])
+                frame_points = batch[offsets[i] - base:offsets[i + 1] - base]
+                frames.append((int(frame_nums[i]), timestamp, frame_to_world(
+                    frame_points, timestamp, track,
+                    deskew=deskew, extrinsics=extrinsics, crop=crop, range_filter=range_filter
+                )))
+            return frames
+
+        for frames in map_ordered(load_chunk, range(pack.chunk_count), workers):
+            yield from frames
+        return
+
+    lidar_dir = session_path / 'lidar'
+    if not lidar_dir.exists():
+        logger.warning("No LiDAR directory found")
+        return
+
+    track = load_poses(session_path)
+    track = track.relative_to(session_origin(track, origin))
+    lidar_timestamps = load_lidar_timestamps(lidar_dir)
+    frames = scan_lidar_frames(lidar_dir, lambda frame_nums: motion_gate(
+        frame_timestamps(lidar_timestamps, frame_nums), track, min_translation, min_rotation
+    ))
+    timestamps = frame_timestamps(lidar_timestamps, (frame.frame_num for frame in frames))
+
+    def load_frame(i: int) -> Optional[PointBatch]:
+        return load_world_frame(
+            frames[i], optional_timestamp(timestamps[i]), track,
+            deskew=deskew, extrinsics=extrinsics, crop=crop, range_filter=range_filter
+        )
+
+    for i, world_points in enumerate(map_ordered(load_frame, range(len(frames)), workers)):
+        if world_points is not None:
+            yield frames[i].frame_num, optional_timestamp(timestamps[i]), world_points
+
+
+def load_session_data(
+    session_path: Path,
+    workers: int = 0,
+    deskew: bool = True,
+    origin: str = 'first_pose',
+    min_translation: float = 0.0,
+    min_rotation: float = 0.0,
+    crop: Optional[SensorCrop] = None,
+    range_filter: Optional['RangeImageFilter'] = None
+) -> tuple[PointBatch, list[dict], list[Path], np.ndarray]:
+    """
+    Load session data for splatting.
+    
+    LiDAR frames are loaded on a thread pool (NumPy releases the GIL for
+    the heavy parts, and threads avoid pickling point arrays between
+    processes). Frame order is preserved.
+
+    Points are accumulated in two passes: PCD headers are summed to size a
+    single columnar batch, then every frame writes its sensor-frame points
+    straight into its own slice, so the cloud never exists twice. Per-point
+    attributes (intensity, ring, time) are kept when every frame has them.
+    The whole buffer is then transformed to world frame in place, in one
+    batched pass (see transform_frames_to_world), through the recording
+    rover's LiDAR mount (see session_lidar_extrinsics).
+
+    If the session has a pack (see write_session_pack), frames, poses and
+    timestamps are read from it instead, a chunk at a time.
+
+    With deskew on, frames that carry per-point times are motion compensated
+    point by point (see deskew_points).
+
+    World coordinates (points and camera poses) are float32 relative to a
+    session origin; add the returned origin to recover absolute positions.
+
+    Args:
+        session_path: Session directory
+        workers: Frame loading threads (0 = one per CPU)
+        deskew: Transform each point with its own pose when frames carry
+            per-point times
+        origin: Local origin mode (see session_origin)
+        min_translation: Motion gate translation threshold, meters
+        min_rotation: Motion gate rotation threshold, degrees
+        crop: Sensor-frame crop applied to every frame before the transform
+        range_filter: Per-frame range-image filter, applied after the crop
+
+    Returns:
+        points: PointBatch of LiDAR points in world frame
+        poses: List of camera poses with timestamps
+        images: List of image paths
+        origin: (3,) float64 world position of the local origin
+    """
+    logger.info(f"Loading session from {session_path}")
+    
+    pack = open_session_pack(session_path)
+    if pack is not None:
+        logger.info(f"Reading session pack {pack.path}")
+    
+    # Load poses first
+    track = pack.pose_track() if pack is not None else load_poses(session_path)
+    world_origin = session_origin(track, origin)
+    track = track.relative_to(world_origin)
+    logger.info(f"Local origin ({origin}): {world_origin.round(3).tolist()}")
+    
+    lidar_dir = session_path / 'lidar'
+    
+    # Load LiDAR points with pose transformation
+    if pack is not None:
+        frame_nums, timestamps, pack_offsets = pack.frame_index()
+        logger.info(f"Found {len(frame_nums)} LiDAR frames in {pack.chunk_count} chunks "
+                    f"({pack_offsets[-1]} points)")
+        
+        # Gated-out frames keep their row in the frame table with no points
+        keep = motion_gate(timestamps, track, min_translation, min_rotation)
+        offsets = np.zeros_like(pack_offsets)
+        np.cumsum(np.diff(pack_offsets) * keep, out=offsets[1:])
+        points = PointBatch.allocate(offsets[-1], pack.columns)
+        
+        # Chunks are decoded in parallel straight into their slice of the
+        # buffer; each returns its per-frame point counts after the crop
+        def load_chunk(chunk: int) -> np.ndarray:
+            start, end = pack.chunk_frames(chunk)
+            counts = np.zeros(end - start, dtype=np.int64)
+            if not keep[start:end].any():
+                return counts
+            batch = pack.read_chunk(chunk)
+            if crop is None and range_filter is None and keep[start:end].all():
+                points[offsets[start]:offsets[end]] = batch
+                return np.diff(pack_offsets[start:end + 1])
+            base = pack_offsets[start]
+            filled = offsets[start]
+            for i in np.flatnonzero(keep[start:end]) + start:
+                frame_points = batch[pack_offsets[i] - base:pack_offsets[i + 1] - base]
+                if crop is not None:
+                    frame_points = crop.apply(frame_points)
+                if range_filter is not None:
+                    frame_points = range_filter.apply(frame_points)
+                points[filled:filled + len(frame_points)] = frame_points
+                filled += len(frame_points)
+                counts[i - start] = len(frame_points)
+            return counts
+        
+        chunk_counts = list(map_ordered(load_chunk, range(pack.chunk_count), workers))
+        
+        # Close gaps left by cropped points
+        filled = 0
+        for chunk, counts in enumerate(chunk_counts):
+            start, _ = pack.chunk_frames(chunk)
+            count = int(counts.sum())
+            if count and offsets[start] != filled:
+                points[filled:filled + count] = points[offsets[start]:offsets[start] + count]
+            filled += count
+        points = points[:filled]
+        counts = np.concatenate(chunk_counts) if chunk_counts else np.zeros(0, dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+    elif lidar_dir.exists():
+        # Pass 1: headers only, to size the output buffer. Frames the
+        # motion gate drops are not even opened.
+        lidar_timestamps = load_lidar_timestamps(lidar_dir)
+        frames = scan_lidar_frames(lidar_dir, lambda frame_nums: motion_gate(
+            frame_timestamps(lidar_timestamps, frame_nums), track, min_translation, min_rotation
+        ))
+        timestamps = frame_timestamps(lidar_timestamps, (frame.frame_num for frame in frames))
+        offsets = np.cumsum([0] + [frame.header.points for frame in frames])
+        columns = lidar_frame_columns(frames)
+        points = PointBatch.allocate(offsets[-1], columns)
+        logger.info(f"Found {len(frames)} LiDAR frames ({offsets[-1]} points, "
+                    f"columns: {', '.join(points.columns)})")
+        
+        # Pass 2: every frame is parsed (and cropped) into its own slice
+        # of the buffer
+        def load_frame(i: int) -> int:
+            batch = load_pcd(frames[i].path, frames[i].header)
+            if batch is None:
+                return 0
+            if crop is not None:
+                batch = crop.apply(batch)
+            if range_filter is not None:
+                batch = range_filter.apply(batch)
+            points[offsets[i]:offsets[i] + len(batch)] = batch
+            return len(batch)
+        
+        counts = list(map_ordered(load_frame, range(len(frames)), workers))
+        
+        # Close gaps left by frames with fewer valid (or kept) points than
+        # their header
+        filled = 0
+        for start, count in zip(offsets, counts):
+            if count and start != filled:
+                points[filled:filled + count] = points[start:start + count]
+            filled += count
+        points = points[:filled]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+    else:
+        points = PointBatch.allocate(0)
+        logger.warning("No LiDAR directory found")
+    
+    # All frames to world frame in one batched pass
+    if len(points) > 0:
+        transform_frames_to_world(
+            points, offsets, timestamps, track, deskew, workers,
+            extrinsics=session_lidar_extrinsics(session_path)
+        )
+        logger.info(f"Loaded {len(points)} total points (world frame)")
+        if range_filter is not None:
+            range_filter.log_stats()
+    
+    camera_poses, images = load_camera_poses(session_path, track, pack)
+    
+    return points, camera_poses, images, world_origin
+
+
+def load_camera_poses(
+    session_path: Path,
+    track: PoseTrack,
+    pack: Optional['SessionPack'] = None
+) -> tuple[list[dict], list[Path]]:
+    """
+    List a session's camera images and interpolate their poses.
+
+    Args:
+        session_path: Session directory
+        track: Pose trajectory (relative to the session origin)
+        pack: Session pack to read camera timestamps from, if any
+
+    Returns:
+        Tuple of (camera poses with timestamps, image paths)
+    """
+    camera_dir = session_path / 'camera'
+    images = []
+
+    if camera_dir.exists():
+        images = sorted(camera_dir.glob('*.jpg'))
+        logger.info(f"Found {len(images)} camera frames")
+    else:
+        logger.warning("No camera directory found")
+
+    # Build camera pose list from poses
+    if pack is not None:
+        camera_frames, timestamps = pack.camera_timestamps()
+    else:
+        camera_frames, timestamps = load_camera_timestamps(camera_dir)
+
+    # Interpolate all camera frames in one batch (identity without poses)
+    if len(track) > 0:
+        positions, rotations = track.interpolate(timestamps)
+    else:
+        positions = np.zeros((len(timestamps), 3))
+        rotations = np.tile([0.0, 0.0, 0.0, 1.0], (len(timestamps), 1))
+
+    camera_poses = [
+        {
+            'frame': frame_num,
+            'timestamp': timestamp,
+            'position': position,
+            'rotation': rotation
+        }
+        for frame_num, timestamp, position, rotation
+        in zip(camera_frames.tolist(), timestamps.tolist(), positions.tolist(), rotations.tolist())
+    ]
+    return camera_poses, images
+
+
+def stream_session_data(
+    session_path: Path,
+    voxel_size: float = 0.05,
+    voxel_mode: str = 'first',
+    memory_budget: Optional[int] = None,
+    workers: int = 0,
+    deskew: bool = True,
+    origin: str = 'first_pose',
+    min_translation: float = 0.0,
+    min_rotation: float = 0.0,
+    crop: Optional[SensorCrop] = None,
+    range_filter: Optional['RangeImageFilter'] = None
+) -> tuple[PointBatch | np.ndarray, list[dict], list[Path], np.ndarray]:
+    """
+    Load session data for splatting, voxelizing frames as they stream in.
+
+    Like load_session_data, but each world-frame frame from
+    iter_session_frames is absorbed into a VoxelAccumulator as it arrives,
+    so the raw cloud is never held: memory follows the occupied voxels,
+    for sessions too long to load whole. The points returned are what
+    voxel_downsample would make of load_session_data's.
+
+    Args:
+        session_path: Session directory
+        voxel_size: Voxel edge length in meters
+        voxel_mode: Point kept per voxel ('first', 'nearest' or 'centroid')
+        memory_budget: Voxelizing memory budget in bytes; past it, frames
+            are spilled to disk and voxelized out of core (see
+            SpillVoxelizer). None = hold the voxel grid in memory
+        workers, deskew, origin, min_translation, min_rotation, crop,
+            range_filter: As for load_session_data
+
+    Returns:
+        points: Voxelized LiDAR points in world frame
+        poses: List of camera poses with timestamps
+        images: List of image paths
+        origin: (3,) float64 world position of the local origin
+    """
+    logger.info(f"Streaming session from {session_path}")
+
+    pack = open_session_pack(session_path)
+    track = pack.pose_track() if pack is not None else load_poses(session_path)
+    world_origin = session_origin(track, origin)
+    track = track.relative_to(world_origin)
+    logger.info(f"Local origin ({origin}): {world_origin.round(3).tolist()}")
+
+    if memory_budget is not None:
+        accumulator = SpillVoxelizer(voxel_size, voxel_mode, memory_budget=memory_budget, workers=workers)
+    else:
+        accumulator = VoxelAccumulator(voxel_size, voxel_mode)
+    frame_count = 0
+    for _, _, world_points in iter_session_frames(
+        session_path, workers, deskew, origin, min_translation, min_rotation, crop, range_filter
+    ):
+        accumulator.add(world_points)
+        frame_count += 1
+    points, stats = accumulator.finalize()
+    logger.info(f"Voxelized {accumulator.points_seen} points from {frame_count} frames "
+                f"into {len(points)} voxels (voxel_size={voxel_size}m, mode={voxel_mode}, world frame)")
+    if range_filter is not None:
+        range_filter.log_stats()
+
+    camera_poses, images = load_camera_poses(session_path, track, pack)
+    return points, camera_poses, images, world_origin
+
+
+@dataclass
+class SessionManifest:
+    """Session summary built from PCD headers and CSV lengths only."""
+    lidar_frames: int
+    total_points: int
+    lidar_start: Optional[float]
+    lidar_end: Optional[float]
+    pose_samples: int
+    pose_start: Optional[float]
+    pose_end: Optional[float]
+    pose_coverage: float  # Fraction of the LiDAR time span covered by poses
+    camera_frames: int
+    estimated_bytes: int  # World-frame cloud held by load_session_data, all columns
+
+    def rejection_reason(self) -> Optional[str]:
+        """Why the session cannot produce a map, or None if it can."""
+        if self.lidar_frames == 0:
+            return 'No readable LiDAR frames in session'
+        if self.total_points == 0:
+            return 'LiDAR frames contain no points'
+        return None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def scan_csv(path: Path, column: int) -> tuple[int, Optional[float], Optional[float]]:
+    """
+    Count the data rows of a CSV and read one column of its first and last row.
+
+    Returns:
+        (rows, first_value, last_value); values are None if missing or
+        unparseable
+    """
+    if not path.exists():
+        return 0, None, None
+
+    data = path.read_bytes().strip()
+    lines = data.split(b'\n', 2)
+    rows = data.count(b'\n')  # Header excluded
+    if rows == 0:
+        return 0, None, None
+
+    def value(line: bytes) -> Optional[float]:
+        try:
+            return float(line.split(b',')[column])
+        except (IndexError, ValueError):
+            return None
+
+    return rows, value(lines[1]), value(data.rsplit(b'\n', 1)[-1])
+
+
+def scan_session(
+    session_path: Path,
+    frames: Optional[list['LidarFrame']] = None
+) -> SessionManifest:
+    """
+    Summarize a session without loading any point data.
+
+    Reads only PCD headers and the CSV files' first/last rows and lengths,
+    so it is cheap enough to run before every job to reject empty sessions
+    and size memory up front.
+
+    Args:
+        session_path: Session directory
+        frames: Already scanned LiDAR frames (scanned here if None)
+    """
+    lidar_dir = session_path / 'lidar'
+    camera_dir = session_path / 'camera'
+
+    if frames is None:
+        frames = scan_lidar_frames(lidar_dir) if lidar_dir.exists() else []
+    total_points = sum(frame.header.points for frame in frames)
+
+    _, lidar_start, lidar_end = scan_csv(lidar_dir / 'timestamps.csv', column=1)
+    pose_samples, pose_start, pose_end = scan_csv(session_path / 'poses.csv', column=0)
+
+    pose_coverage = 0.0
+    if None not in (lidar_start, lidar_end, pose_start, pose_end):
+        overlap = min(lidar_end, pose_end) - max(lidar_start, pose_start)
+        span = lidar_end - lidar_start
+        if span > 0:
+            pose_coverage = float(np.clip(overlap / span, 0.0, 1.0))
+        elif pose_start <= lidar_start <= pose_end:
+            pose_coverage = 1.0
+
+    camera_frames = len(list(camera_dir.glob('*.jpg'))) if camera_dir.exists() else 0
+
+    # Every column load_session_data allocates for these frames
+    point_bytes = 0
+    for name in lidar_frame_columns(frames):
+        dtype, shape = PointBatch.COLUMNS[name]
+        point_bytes += np.dtype(dtype).itemsize * int(np.prod(shape))
+
+    return SessionManifest(
+        lidar_frames=len(frames),
+        total_points=total_points,
+        lidar_start=lidar_start,
+        lidar_end=lidar_end,
+        pose_samples=pose_samples,
+        pose_start=pose_start,
+        pose_end=pose_end,
+        pose_coverage=pose_coverage,
+        camera_frames=camera_frames,
+        estimated_bytes=total_points * point_bytes,
+    )
+
+
+# =============================================================================
+# PCD Files
+# =============================================================================
+
+# Optional C implementation of LZF for binary_compressed PCD
+try:
+    import lzf
+    HAS_LZF = True
+except ImportError:
+    HAS_LZF = False
+
+# PCD (TYPE, SIZE) -> numpy scalar type
+PCD_NUMPY_TYPES = {
+    ('F', 4): np.float32,
+    ('F', 8): np.float64,
+    ('U', 1): np.uint8,
+    ('U', 2): np.uint16,
+    ('U', 4): np.uint32,
+    ('U', 8): np.uint64,
+    ('I', 1): np.int8,
+    ('I', 2): np.int16,
+    ('I', 4): np.int32,
+    ('I', 8): np.int64,
+}
+
+
+@dataclass
+class PcdHeader:
+    """Parsed header of a PCD file."""
+    fields: list[str]
+    sizes: list[int]
+    types: list[str]
+    counts: list[int]
+    width: int
+    height: int
+    points: int
+    data: str  # 'ascii', 'binary' or 'binary_compressed'
+    data_offset: int  # Byte offset of the data section
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Structured dtype of one point record (little-endian, packed)."""
+        names = []
+        formats = []
+        for i, (name, size, type_, count) in enumerate(
+            zip(self.fields, self.sizes, self.types, self.counts)
+        ):
+            scalar = PCD_NUMPY_TYPES.get((type_, size))
+            if scalar is None:
+                raise ValueError(f"Unsupported PCD field type {type_}{size} for '{name}'")
+            # PCL pads records with repeated '_' fields; keep names unique
+            names.append(f"_{i}" if name == '_' or name in names else name)
+            scalar = np.dtype(scalar).newbyteorder('<')
+            formats.append(scalar if count == 1 else (scalar, (count,)))
+        return np.dtype({'names': names, 'formats': formats})
+
+
+def read_pcd_header(path: Path) -> PcdHeader:
+    """
+    Read the header of a PCD file without touching the point data.
+
+    Raises:
+        ValueError: If the header is malformed or has no DATA line
+    """
+    values: dict[str, list[str]] = {}
+    offset = 0
+
+    with open(path, 'rb') as f:
+        for raw in f:
+            offset += len(raw)
+            line = raw.decode('ascii', errors='replace').strip()
+            if not line or line.startswith('#'):
+                continue
+            key, *rest = line.split()
+            values[key.upper()] = rest
+            if key.upper() == 'DATA':
+                break
+        else:
+            raise ValueError(f"No DATA line in PCD header: {path}")
+
+    try:
+        fields = values['FIELDS']
+        sizes = [int(v) for v in values['SIZE']]
+        types = [v.upper() for v in values['TYPE']]
+        counts = [int(v) for v in values.get('COUNT', ['1'] * len(fields))]
+        width = int(values.get('WIDTH', ['0'])[0])
+        height = int(values.get('HEIGHT', ['1'])[0])
+        points = int(values.get('POINTS', [str(width * height)])[0])
+        data = values['DATA'][0].lower()
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Malformed PCD header in {path}: {e}") from e
+
+    if not (len(fields) == len(sizes) == len(types) == len(counts)):
+        raise ValueError(f"Inconsistent FIELDS/SIZE/TYPE/COUNT in {path}")
+    if data not in ('ascii', 'binary', 'binary_compressed'):
+        raise ValueError(f"Unsupported PCD DATA format '{data}' in {path}")
+
+    return PcdHeader(
+        fields=fields,
+        sizes=sizes,
+        types=types,
+        counts=counts,
+        width=width,
+        height=height,
+        points=points,
+        data=data,
+        data_offset=offset,
+    )
+
+
+def lzf_decompress(data: bytes, expected_size: int) -> bytes:
+    """
+    Decompress an LZF block, as used by binary_compressed PCD.
+
+    Uses python-lzf when installed, otherwise a pure Python decoder.
+    """
+    if HAS_LZF:
+        out = lzf.decompress(data, expected_size)
+        if out is None or len(out) != expected_size:
+            raise ValueError("LZF decompression failed")
+        return out
+
+    out = bytearray(expected_size)
+    ip = 0
+    op = 0
+    end = len(data)
+
+    while ip < end:
+        ctrl = data[ip]
+        ip += 1
+
+        if ctrl < 32:
+            # Literal run of ctrl + 1 bytes
+            length = ctrl + 1
+            out[op:op + length] = data[ip:ip + length]
+            ip += length
+            op += length
+            continue
+
+        # Back reference: 3 bits length, 13 bits distance
+        length = ctrl >> 5
+        if length == 7:
+            length += data[ip]
+            ip += 1
+        length += 2
+        ref = op - ((ctrl & 0x1f) << 8) - data[ip] - 1
+        ip += 1
+        if ref < 0 or op + length > expected_size:
+            raise ValueError("Corrupt LZF stream")
+
+        # Overlapping references repeat the last (op - ref) bytes
+        distance = op - ref
+        while length > 0:
+            chunk = min(length, distance)
+            out[op:op + chunk] = out[ref:ref + chunk]
+            op += chunk
+            ref += chunk
+            length -= chunk
+
+    if op != expected_size:
+        raise ValueError(f"LZF size mismatch: got {op}, expected {expected_size}")
+    return bytes(out)
+
+
+def map_pcd(path: Path, header: Optional[PcdHeader] = None) -> Optional[np.ndarray]:
+    """
+    Memory-map the point records of a binary PCD file.
+
+    Records are paged in by the OS on first access and stay in the page
+    cache across re-runs, so nothing is read until a field is touched.
+
+    Returns:
+        Read-only structured memmap at the data offset, or None if the file
+        is not DATA binary (ascii and binary_compressed cannot be mapped)
+    """
+    if header is None:
+        header = read_pcd_header(path)
+    if header.data != 'binary':
+        return None
+
+    dtype = header.dtype
+    available = (path.stat().st_size - header.data_offset) // dtype.itemsize
+    count = min(header.points, available)
+    if count < header.points:
+        logger.warning(f"Truncated PCD {path}: {count}/{header.points} points")
+    if count <= 0:
+        return np.zeros(0, dtype=dtype)
+
+    return np.memmap(path, dtype=dtype, mode='r', offset=header.data_offset, shape=(count,))
+
+
+def read_pcd(path: Path, header: Optional[PcdHeader] = None) -> np.ndarray:
+    """
+    Read the point records of a PCD file.
+
+    Binary data is memory-mapped (see map_pcd) rather than copied; compressed
+    data is decompressed once and its field columns interleaved. ASCII data
+    is read in one call, parsed in bulk and written into a record array
+    preallocated from the POINTS count.
+
+    Returns:
+        Structured array with one record per point (see PcdHeader.dtype)
+    """
+    if header is None:
+        header = read_pcd_header(path)
+    dtype = header.dtype
+
+    if header.data == 'binary':
+        return map_pcd(path, header)
+
+    with open(path, 'rb') as f:
+        f.seek(header.data_offset)
+        buf = f.read()
+
+    if header.data == 'binary_compressed':
+        if len(buf) < 8:
+            raise ValueError(f"Truncated binary_compressed PCD {path}")
+        compressed_size, uncompressed_size = (int(v) for v in np.frombuffer(buf, dtype='<u4', count=2))
+        if uncompressed_size != header.points * dtype.itemsize:
+            raise ValueError(f"PCD {path}: uncompressed size {uncompressed_size} "
+                             f"does not match {header.points} points")
+        raw = lzf_decompress(buf[8:8 + compressed_size], uncompressed_size)
+
+        # Data is stored column by column: all values of field 0, then field 1, ...
+        cloud = np.empty(header.points, dtype=dtype)
+        column_offset = 0
+        for name in dtype.names:
+            field = dtype.fields[name][0]
+            column = np.frombuffer(
+                raw,
+                dtype=field.base,
+                count=header.points * (field.itemsize // field.base.itemsize),
+                offset=column_offset,
+            )
+            cloud[name] = column.reshape((header.points,) + field.shape)
+            column_offset += header.points * field.itemsize
+        return cloud
+
+    # ASCII: one row per point, COUNT values per field, parsed in one C pass.
+    # 8-byte fields (e.g. absolute timestamps) need float64 to survive.
+    text_dtype = np.float64 if max(header.sizes) == 8 else np.float32
+    values = np.fromstring(buf, dtype=text_dtype, sep=' ')
+
+    columns = sum(header.counts)
+    rows = min(header.points, len(values) // columns)
+    if rows < header.points:
+        logger.warning(f"Truncated PCD {path}: {rows}/{header.points} points")
+    values = values[:rows * columns]
+
+    # All-float32 layouts (the common x/y/z/intensity case) are a plain view
+    if dtype.itemsize == columns * values.itemsize and all(
+        dtype.fields[name][0].base == values.dtype for name in dtype.names
+    ):
+        return values.view(dtype)
+
+    values = values.reshape(rows, columns)
+    cloud = np.empty(rows, dtype=dtype)
+    column = 0
+    for name, count in zip(dtype.names, header.counts):
+        cloud[name] = values[:, column] if count == 1 else values[:, column:column + count]
+        column += count
+    return cloud
+
+
+# PCD field names carrying each PointBatch attribute, in order of preference
+PCD_ATTRIBUTE_FIELDS = {
+    'intensity': ('intensity', 'reflectivity'),
+    'ring': ('ring', 'line'),
+    'time': ('time', 't', 'offset_time', 'timestamp'),
+}
+
+
+def pcd_attribute_fields(fields: Iterable[str]) -> dict[str, str]:
+    """Map PointBatch attribute names to the PCD fields that provide them."""
+    fields = set(fields)
+    found = {}
+    for attribute, candidates in PCD_ATTRIBUTE_FIELDS.items():
+        for candidate in candidates:
+            if candidate in fields:
+                found[attribute] = candidate
+                break
+    return found
+
+
+# Candidate units of PCD time fields (s, ms, us, ns) and the span of a
+# plausible sweep; the window is narrower than the 1000x unit steps, so
+# at most one unit fits
+PCD_TIME_SCALES = (1.0, 1e-3, 1e-6, 1e-9)
+SWEEP_SPAN_RANGE = (0.01, 1.0)  # s
+
+
+def point_time_offsets(values: np.ndarray, field: str) -> np.ndarray:
+    """
+    Rebase a PCD time field to seconds since the frame's first point.
+
+    Drivers disagree on units (Livox writes float64 nanoseconds, Ouster
+    integer nanoseconds, Velodyne float seconds), so the unit is inferred
+    from the field's span, which must look like one sweep. Frames whose
+    span fits no unit get zero offsets, so they are not deskewed.
+    """
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.float64)
+    offsets = (values - values.min()).astype(np.float64)
+    span = float(offsets.max())
+    if span == 0:
+        return offsets
+    for scale in PCD_TIME_SCALES:
+        if SWEEP_SPAN_RANGE[0] <= span * scale <= SWEEP_SPAN_RANGE[1]:
+            offsets *= scale
+            return offsets
+    logger.warning(f"PCD time field '{field}' spans {span:g} units, not a sweep "
+                   f"in s, ms, us or ns; not deskewing this frame")
+    return np.zeros(len(values), dtype=np.float64)
+
+
+def pcd_points(cloud: np.ndarray) -> PointBatch:
+    """
+    Convert a structured PCD array into a PointBatch.
+
+    Keeps x/y/z plus intensity, ring and per-point time when present.
+    Times are rebased to the frame's first point and converted to seconds
+    (see point_time_offsets). Points with non-finite coordinates are
+    dropped.
+    """
+    xyz = np.empty((len(cloud), 3), dtype=np.float32)
+    xyz[:, 0] = cloud['x']
+    xyz[:, 1] = cloud['y']
+    xyz[:, 2] = cloud['z']
+    batch = PointBatch(xyz)
+
+    for attribute, field in pcd_attribute_fields(cloud.dtype.names).items():
+        values = cloud[field]
+        if attribute == 'time':
+            values = point_time_offsets(values, field)
+        dtype, _ = PointBatch.COLUMNS[attribute]
+        setattr(batch, attribute, np.asarray(values, dtype=dtype))
+
+    # Organized clouds mark missing returns with NaN
+    finite = np.isfinite(xyz).all(axis=1)
+    if not finite.all():
+        batch = batch[finite]
+    return batch
+
+
+def load_pcd(path: Path, header: Optional[PcdHeader] = None) -> Optional[PointBatch]:
+    """Load points and their attributes from a PCD file (any DATA format)."""
+    try:
+        points = pcd_points(read_pcd(path, header))
+        return points if len(points) else None
+    except Exception as e:
+        logger.warning(f"Failed to load PCD {path}: {e}")
+        return None
+
+
+@dataclass
+class LidarFrame:
+    """A LiDAR frame on disk, known from its PCD header only."""
+    frame_num: int
+    path: Path
+    header: PcdHeader
+
+
+def scan_lidar_frames(
+    lidar_dir: Path,
+    frame_filter: Optional[Callable[[np.ndarray], np.ndarray]] = None
+) -> list[LidarFrame]:
+    """
+    Find the PCD frames in a LiDAR directory and read their headers.
+
+    No point data is read, so this is cheap even for long sessions. Files
+    whose name is not a frame number or whose header cannot be parsed are
+    skipped.
+
+    Args:
+        lidar_dir: LiDAR directory
+        frame_filter: Maps the sorted frame numbers to a keep mask; frames
+            it drops are never opened (see motion_gate)
+
+    Returns:
+        Frames ordered by frame number
+    """
+    paths = {}
+    for path in lidar_dir.glob('*.pcd'):
+        try:
+            paths[int(path.stem)] = path
+        except ValueError:
+            continue
+
+    frame_nums = np.array(sorted(paths), dtype=np.int64)
+    if frame_filter is not None:
+        frame_nums = frame_nums[frame_filter(frame_nums)]
+
+    frames = []
+    for frame_num in frame_nums.tolist():
+        path = paths[frame_num]
+        try:
+            header = read_pcd_header(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping LiDAR frame {path.name}: {e}")
+            continue
+        frames.append(LidarFrame(frame_num=frame_num, path=path, header=header))
+
+    return frames
+
+
+def lidar_frame_columns(frames: list[LidarFrame]) -> set[str]:
+    """PointBatch columns every frame can fill, from their PCD fields."""
+    columns = set(PointBatch.COLUMNS)
+    for frame in frames:
+        columns &= {'xyz', *pcd_attribute_fields(frame.header.fields)}
+    return columns
+
+
+# =============================================================================
+# Session Packs
+# =============================================================================
+#
+# A session pack holds a whole session in one file, so re-processing it
+# costs one open and sequential reads instead of thousands of PCD parses:
+#
+#   MAGIC | blocks ... | index (JSON) | index length (u64 LE) | MAGIC
+#
+# Points are stored in sensor frame (as load_pcd returns them), so every
+# SplatConfig option still applies on re-runs. They are split into chunks
+# of whole frames; each chunk stores one block per PointBatch column. The
+# index also references blocks for the frame table (frame number,
+# timestamp, point count), the pose track and camera timestamps. Blocks
+# are raw little-endian arrays, optionally zlib or LZF compressed (a block
+# that does not shrink is stored raw).
+
+PACK_MAGIC = b'MUNIPACK'
+PACK_VERSION = 2  # 2: time columns with inferred units
+PACK_CHUNK_POINTS = 1 << 22  # ~4M points, ~100 MB with all columns
+
+
+@dataclass
+class SessionPack:
+    """An opened session pack: its path and parsed index."""
+    path: Path
+    index: dict
+
+    @classmethod
+    def open(cls, path: Path) -> 'SessionPack':
+        """Read a pack's index. Raises ValueError if it is not a valid pack."""
+        trailer = len(PACK_MAGIC) + 8
+        with open(path, 'rb') as f:
+            if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+                raise ValueError(f"Not a session pack: {path}")
+            f.seek(-trailer, os.SEEK_END)
+            end = f.read(trailer)
+            if end[8:] != PACK_MAGIC:
+                raise ValueError(f"Truncated session pack: {path}")
+            (index_size,) = struct.unpack('<Q', end[:8])
+            f.seek(-trailer - index_size, os.SEEK_END)
+            index = json.loads(f.read(index_size))
+
+        if index.get('version') != PACK_VERSION:
+            raise ValueError(f"Unsupported session pack version {index.get('version')}: {path}")
+        return cls(path=path, index=index)
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.index['columns'])
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.index['chunks'])
+
+    @property
+    def manifest(self) -> SessionManifest:
+        return SessionManifest(**self.index['manifest'])
+
+    def read_block(self, block: dict) -> np.ndarray:
+        """Read one block. Raw blocks are memory-mapped copy-on-write."""
+        dtype = np.dtype(block['dtype'])
+        shape = tuple(block['shape'])
+        if block['size'] == 0:
+            return np.zeros(shape, dtype=dtype)
+        if block['codec'] == 'none':
+            return np.memmap(self.path, dtype=dtype, mode='c',
+                             offset=block['offset'], shape=shape)
+
+        with open(self.path, 'rb') as f:
+            f.seek(block['offset'])
+            data = f.read(block['size'])
+        expected_size = int(np.prod(shape)) * dtype.itemsize
+        if block['codec'] == 'zlib':
+            data = zlib.decompress(data)
+        elif block['codec'] == 'lzf':
+            data = lzf_decompress(data, expected_size)
+        else:
+            raise ValueError(f"Unknown pack codec: {block['codec']}")
+        return np.frombuffer(data, dtype=dtype).reshape(shape).copy()
+
+    def array(self, name: str) -> np.ndarray:
+        return self.read_block(self.index['arrays'][name])
+
+    def chunk_frames(self, chunk: int) -> tuple[int, int]:
+        """Range [start, end) of frame table rows stored in a chunk."""
+        start, end = self.index['chunks'][chunk]['frames']
+        return start, end
+
+    def read_chunk(self, chunk: int) -> PointBatch:
+        """Sensor-frame points of every frame in a chunk."""
+        blocks = self.index['chunks'][chunk]['blocks']
+        return PointBatch(**{name: self.read_block(block) for name, block in blocks.items()})
+
+    def frame_index(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns:
+            frame_nums: (F,) frame numbers
+            timestamps: (F,) frame timestamps, NaN where unknown
+            offsets: (F + 1,) start row of each frame in pack order
+        """
+        counts = self.array('frame_points')
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return self.array('frame_num'), self.array('frame_timestamp'), offsets
+
+    def pose_track(self) -> PoseTrack:
+        return PoseTrack(
+            timestamps=np.array(self.array('pose_timestamp')),
+            positions=np.array(self.array('pose_position')),
+            rotations=np.array(self.array('pose_rotation')),
+        )
+
+    def camera_timestamps(self) -> tuple[np.ndarray, np.ndarray]:
+        """Camera (frame_nums, timestamps), as load_camera_timestamps."""
+        return self.array('camera_frame'), self.array('camera_timestamp')
+
+
+def session_pack_path(session_path: Path) -> Path:
+    """Where the worker keeps a session's pack (PACKS_DIR mirrors SESSIONS_DIR)."""
+    try:
+        relative = session_path.resolve().relative_to(SESSIONS_DIR.resolve())
+    except ValueError:
+        relative = Path(session_path.name)
+    return PACKS_DIR / relative / 'session.pack'
+
+
+def session_source(session_path: Path) -> dict:
+    """
+    Cheap fingerprint of a session's source files, stored in its pack.
+
+    A pack whose fingerprint no longer matches (frames added, CSVs
+    rewritten) is stale and gets rebuilt.
+    """
+    lidar_dir = session_path / 'lidar'
+    files = {}
+    for name in ('poses.csv', 'lidar/timestamps.csv', 'camera/timestamps.csv'):
+        path = session_path / name
+        files[name] = path.stat().st_size if path.exists() else None
+    return {
+        'lidar_frames': len(list(lidar_dir.glob('*.pcd'))) if lidar_dir.exists() else 0,
+        'files': files,
+    }
+
+
+def open_session_pack(session_path: Path) -> Optional[SessionPack]:
+    """Open a session's pack, or return None if it is missing, stale or unreadable."""
+    path = session_pack_path(session_path)
+    if not path.exists():
+        return None
+
+    try:
+        pack = SessionPack.open(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring session pack {path}: {e}")
+        return None
+
+    if pack.index.get('source') != session_source(session_path):
+        logger.info(f"Session pack {path} is stale")
+        return None
+    return pack
+
+
+def write_session_pack(
+    session_path: Path,
+    pack_path: Optional[Path] = None,
+    codec: str = 'none',
+    chunk_points: int = PACK_CHUNK_POINTS,
+    workers: int = 0
+) -> SessionPack:
+    """
+    Convert a session into a single pack file.
+
+    PCD frames are parsed on a thread pool (as in load_session_data) and
+    written out chunk by chunk, so memory stays around one chunk. The pack
+    is written to a temporary file and renamed into place, so readers never
+    see a partial pack.
+
+    Args:
+        session_path: Session directory
+        pack_path: Output file (default: session_pack_path)
+        codec: Block compression: 'none', 'zlib' or 'lzf'
+        chunk_points: Target points per chunk (chunks hold whole frames)
+        workers: Frame loading threads (0 = one per CPU)
+
+    Returns:
+        The written pack
+    """
+    if codec not in ('none', 'zlib', 'lzf'):
+        raise ValueError(f"Unknown pack codec: {codec}")
+    if codec == 'lzf' and not HAS_LZF:
+        logger.warning("python-lzf not available, packing with zlib instead")
+        codec = 'zlib'
+
+    pack_path = pack_path or session_pack_path(session_path)
+    pack_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = pack_path.with_name(f'.{pack_path.name}.{os.getpid()}.tmp')
+
+    lidar_dir = session_path / 'lidar'
+    frames = scan_lidar_frames(lidar_dir) if lidar_dir.exists() else []
+    columns = [name for name in PointBatch.COLUMNS if name in lidar_frame_columns(frames)]
+    lidar_timestamps = load_lidar_timestamps(lidar_dir)
+    camera_frames, camera_timestamps = load_camera_timestamps(session_path / 'camera')
+    track = load_poses(session_path)
+    source = session_source(session_path)
+    manifest = scan_session(session_path, frames)
+
+    start_time = time.time()
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(PACK_MAGIC)
+
+            def write_block(array: np.ndarray) -> dict:
+                array = np.ascontiguousarray(array)
+                data = array.tobytes()
+                used = 'none'
+                if codec == 'zlib':
+                    packed = zlib.compress(data, 1)
+                elif codec == 'lzf':
+                    packed = lzf.compress(data)  # None if it would not shrink
+                else:
+                    packed = None
+                if packed is not None and len(packed) < len(data):
+                    data, used = packed, codec
+                block = {
+                    'offset': f.tell(),
+                    'size': len(data),
+                    'codec': used,
+                    'dtype': array.dtype.str,
+                    'shape': list(array.shape),
+                }
+                f.write(data)
+                return block
+
+            chunks = []
+            frame_nums = []
+            frame_points = []
+            pending = []  # Batches of the chunk being filled
+            pending_points = 0
+
+            def flush():
+                nonlocal pending, pending_points
+                if not pending:
+                    return
+                blocks = {
+                    name: write_block(np.concatenate(
+                        [getattr(batch, name) for batch in pending]
+                    ).astype(PointBatch.COLUMNS[name][0], copy=False))
+                    for name in columns
+                }
+                end = len(frame_nums)
+                chunks.append({
+                    'frames': [end - len(pending), end],
+                    'rows': pending_points,
+                    'blocks': blocks,
+                })
+                pending, pending_points = [], 0
+
+            def load_frame(frame: LidarFrame) -> tuple[LidarFrame, Optional[PointBatch]]:
+                return frame, load_pcd(frame.path, frame.header)
+
+            for frame, batch in map_ordered(load_frame, frames, workers):
+                if batch is None:
+                    continue
+                frame_nums.append(frame.frame_num)
+                frame_points.append(len(batch))
+                pending.append(batch)
+                pending_points += len(batch)
+                if pending_points >= chunk_points:
+                    flush()
+            flush()
+
+            arrays = {
+                'frame_num': write_block(np.array(frame_nums, dtype='<i8')),
+                'frame_timestamp': write_block(
+                    frame_timestamps(lidar_timestamps, frame_nums).astype('<f8')),
+                'frame_points': write_block(np.array(frame_points, dtype='<i8')),
+                'pose_timestamp': write_block(track.timestamps.astype('<f8')),
+                'pose_position': write_block(track.positions.astype('<f8')),
+                'pose_rotation': write_block(track.rotations.astype('<f8')),
+                'camera_frame': write_block(camera_frames.astype('<i8')),
+                'camera_timestamp': write_block(camera_timestamps.astype('<f8')),
+            }
+
+            index = json.dumps({
+                'version': PACK_VERSION,
+                'source': source,
+                'manifest': manifest.to_dict(),
+                'columns': {
+                    name: [np.dtype(PointBatch.COLUMNS[name][0]).str, list(PointBatch.COLUMNS[name][1])]
+                    for name in columns
+                },
+                'chunks': chunks,
+                'arrays': arrays,
+            }).encode()
+            f.write(index)
+            f.write(struct.pack('<Q', len(index)))
+            f.write(PACK_MAGIC)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    os.replace(tmp_path, pack_path)
+    logger.info(f"Packed {len(frame_nums)} frames ({sum(frame_points)} points, "
+                f"{len(chunks)} chunks, codec {codec}) into {pack_path} "
+                f"({pack_path.stat().st_size / 1e6:.1f} MB) in {time.time() - start_time:.1f}s")
+    return SessionPack.open(pack_path)
+
+
+# =============================================================================
+# Range Images
+# =============================================================================
+
+class RangeImage:
+    """
+    Spherical projection of one sensor-frame LiDAR frame.
+
+    Rows are beams (the ring column, ordered bottom to top) or elevation
+    bins when the frame has no ring; columns are azimuth bins. Each pixel
+    holds the nearest point that fell into it, so a point's neighbours are
+    found in O(1) from the pixels around it instead of a KD-tree query.
+    """
+    __slots__ = ('points', 'index', 'xyz', 'row', 'col')
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        index: np.ndarray,
+        xyz: np.ndarray,
+        row: np.ndarray,
+        col: np.ndarray
+    ):
+        self.points = points  # (N, 3) projected points
+        self.index = index  # (H, W) point index per pixel, -1 where empty
+        self.xyz = xyz  # (H, W, 3) pixel points, NaN where empty
+        self.row = row  # (N,) pixel row of every point
+        self.col = col  # (N,) pixel column of every point
+
+    @classmethod
+    def project(cls, batch: PointBatch, columns: int = 1024, rows: int = 64) -> 'RangeImage':
+        """
+        Project a frame into a range image.
+
+        Args:
+            batch: Frame points in sensor frame
+            columns: Azimuth bins
+            rows: Elevation bins, used when the frame carries no ring
+
+        Returns:
+            RangeImage of the frame
+        """
+        xyz = batch.xyz
+        distance = np.sqrt(np.einsum('ij,ij->i', xyz, xyz, dtype=np.float64))
+        np.maximum(distance, 1e-6, out=distance)
+        elevation = np.arcsin(np.clip(xyz[:, 2] / distance, -1.0, 1.0))
+
+        azimuth = np.arctan2(xyz[:, 1], xyz[:, 0])
+        col = ((azimuth + np.pi) * (columns / (2 * np.pi))).astype(np.int64) % columns
+
+        if batch.ring is not None and len(batch):
+            # Ring numbering is vendor-specific (bottom-up or top-down), so
+            # rows are ordered by each ring's mean elevation
+            ring = batch.ring.astype(np.int64)
+            rings = int(ring.max()) + 1
+            counts = np.bincount(ring, minlength=rings)
+            mean_elevation = np.bincount(ring, weights=elevation, minlength=rings) / np.maximum(counts, 1)
+            mean_elevation[counts == 0] = np.inf
+            rank = np.empty(rings, dtype=np.int64)
+            rank[np.argsort(mean_elevation, kind='stable')] = np.arange(rings)
+            row = rank[ring]
+            height = int(np.count_nonzero(counts))
+        else:
+            height = rows
+            low, high = (elevation.min(), elevation.max()) if len(batch) else (0.0, 0.0)
+            span = max(high - low, 1e-6)
+            row = np.minimum(((elevation - low) * (rows / span)).astype(np.int64), rows - 1)
+
+        # The nearest point in each pixel wins it
+        pixel = row * columns + col
+        nearest = np.full(height * columns, np.inf)
+        np.minimum.at(nearest, pixel, distance)
+        winners = np.flatnonzero(distance == nearest[pixel])
+        index = np.full(height * columns, -1, dtype=np.int64)
+        index[pixel[winners]] = winners
+
+        grid = np.full((height * columns, 3), np.nan, dtype=np.float32)
+        grid[pixel[winners]] = xyz[winners]
+        return cls(
+            points=xyz,
+            index=index.reshape(height, columns),
+            xyz=grid.reshape(height, columns, 3),
+            row=row,
+            col=col,
+        )
+
+    def neighbor_distances(self, row_radius: int = 1, col_radius: int = 4) -> np.ndarray:
+        """
+        Distances from every pixel to the pixels in a window around it.
+
+        Columns wrap around at +/-180 degrees azimuth; rows do not.
+
+        Returns:
+            (M, H, W) distances, inf where either pixel is empty
+        """
+        height, width, _ = self.xyz.shape
+        padded = np.pad(self.xyz, ((row_radius, row_radius), (0, 0), (0, 0)), constant_values=np.nan)
+        padded = np.concatenate([padded[:, width - col_radius:], padded, padded[:, :col_radius]], axis=1)
+
+        distances = []
+        for dr in range(-row_radius, row_radius + 1):
+            for dc in range(-col_radius, col_radius + 1):
+                if dr == 0 and dc == 0:
+                    continue
+                shifted = padded[row_radius + dr:row_radius + dr + height,
+                                 col_radius + dc:col_radius + dc + width]
+                delta = shifted - self.xyz
+                distances.append(np.sqrt(np.einsum('ijk,ijk->ij', delta, delta)))
+        distances = np.stack(distances)
+        distances[np.isnan(distances)] = np.inf
+        return distances
+
+    def outlier_mask(
+        self,
+        k_neighbors: int = 8,
+        std_ratio: float = 2.0,
+        row_radius: int = 1,
+        col_radius: int = 4
+    ) -> np.ndarray:
+        """
+        Statistical outlier test over pixel neighbourhoods.
+
+        The rule of remove_statistical_outliers (mean distance to the k
+        nearest neighbours above mean + std_ratio * std), with neighbours
+        taken from the surrounding pixels. Distances are divided by the
+        point's range: pixels are a fixed angle apart, so raw spacing grows
+        with range and would flag the far rings of every frame. Points that
+        lost their pixel to a nearer one are kept if that point is kept and
+        lies within the threshold of them.
+
+        Returns:
+            (N,) bool mask of points to keep
+        """
+        distances = self.neighbor_distances(row_radius, col_radius)
+        k = min(k_neighbors, len(distances))
+        nearest = np.partition(distances, k - 1, axis=0)[:k]
+        finite = np.isfinite(nearest)
+        found = finite.sum(axis=0)
+        ranges = np.maximum(np.sqrt(np.einsum('ijk,ijk->ij', self.xyz, self.xyz)), 1e-3)
+        scores = np.where(finite, nearest, 0.0).sum(axis=0) / (np.maximum(found, 1) * ranges)
+        scores[found == 0] = np.inf
+
+        supported = scores[(self.index >= 0) & (found > 0)]
+        if len(supported) == 0:
+            return np.ones(len(self.row), dtype=bool)
+        threshold = supported.mean() + std_ratio * supported.std()
+        keep = (scores < threshold)[self.row, self.col]
+
+        offset = self.xyz[self.row, self.col] - self.points
+        point_ranges = np.maximum(np.sqrt(np.einsum('ij,ij->i', self.points, self.points)), 1e-3)
+        return keep & (np.sqrt(np.einsum('ij,ij->i', offset, offset)) < threshold * point_ranges)
+
+    def ground_mask(self, ground_threshold: float = 0.1, max_slope: float = 10.0) -> np.ndarray:
+        """
+        Label ground points by walking each column from the lowest beam up.
+
+        A pixel is ground when the slope from the previous point in its
+        column is below max_slope and either that point was ground or the
+        pixel lies within ground_threshold of the frame's ground height
+        (the median height seen by the lowest beam of each column).
+
+        Args:
+            ground_threshold: Height tolerance around the ground, in meters
+            max_slope: Steepest ground slope between beams, in degrees
+
+        Returns:
+            (N,) bool mask of ground points
+        """
+        height, width, _ = self.xyz.shape
+        occupied = self.index >= 0
+        labels = np.zeros((height, width), dtype=bool)
+        if not occupied.any():
+            return labels[self.row, self.col]
+
+        first = np.argmax(occupied, axis=0)
+        has_point = occupied.any(axis=0)
+        ground_z = np.median(self.xyz[first[has_point], np.flatnonzero(has_point), 2])
+        max_rise = np.tan(np.radians(max_slope))
+
+        previous = np.full((width, 3), np.nan, dtype=np.float32)
+        previous_ground = np.zeros(width, dtype=bool)
+        for r in range(height):
+            current = self.xyz[r]
+            valid = occupied[r]
+            near_ground = np.abs(current[:, 2] - ground_z) < ground_threshold
+            delta = current - previous
+            rise = np.abs(delta[:, 2])
+            run = np.hypot(delta[:, 0], delta[:, 1])
+            # The lowest point of a column has nothing below it to slope from
+            gentle = np.where(np.isnan(previous[:, 0]), True, rise <= max_rise * run)
+            labels[r] = valid & gentle & (previous_ground | near_ground)
+            previous[valid] = current[valid]
+            previous_ground[valid] = labels[r, valid]
+        return labels[self.row, self.col]
+
+
+@dataclass
+class RangeImageFilter:
+    """
+    Per-frame outlier rejection (and optional ground removal) on range images.
+
+    Runs on each small sensor-frame frame inside the parallel frame loaders,
+    in place of the outlier pass over the merged world cloud.
+    """
+    columns: int = 1024
+    rows: int = 64
+    k_neighbors: int = 8
+    std_ratio: float = 2.0
+    remove_ground: bool = False
+    ground_threshold: float = 0.1
+    stats: dict = field(default_factory=lambda: {'frames': 0, 'points': 0, 'outliers': 0, 'ground': 0})
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def from_config(cls, config: SplatConfig) -> Optional['RangeImageFilter']:
+        """The filter a job configures, or None if it is off."""
+        if not config.range_image_filter:
+            return None
+        return cls(
+            columns=config.range_image_columns,
+            rows=config.range_image_rows,
+            remove_ground=config.range_image_remove_ground,
+        )
+
+    def apply(self, batch: PointBatch) -> PointBatch:
+        if len(batch) <= self.k_neighbors:
+            return batch
+        image = RangeImage.project(batch, self.columns, self.rows)
+        keep = image.outlier_mask(self.k_neighbors, self.std_ratio)
+        outliers = len(keep) - int(np.count_nonzero(keep))
+        ground_count = 0
+        if self.remove_ground:
+            ground = image.ground_mask(self.ground_threshold) & keep
+            ground_count = int(np.count_nonzero(ground))
+            keep &= ~ground
+        with self.lock:
+            self.stats['frames'] += 1
+            self.stats['points'] += len(batch)
+            self.stats['outliers'] += outliers
+            self.stats['ground'] += ground_count
+        return batch[keep]
+
+    def log_stats(self):
+        stats = self.stats
+        ground = f", {stats['ground']} ground points removed" if self.remove_ground else ""
+        logger.info(f"Range-image filter: {stats['outliers']} outliers removed{ground} "
+                    f"({stats['points']} points in {stats['frames']} frames)")
+
+
+# =============================================================================
+# Point Cloud Preprocessing
+# =============================================================================
+
+# Voxel keys pack three 21-bit biased voxel coordinates into one int64,
+# covering +/-2^20 voxels around the session origin (52 km at 5 cm)
+VOXEL_KEY_BITS = 21
+VOXEL_KEY_BIAS = 1 << (VOXEL_KEY_BITS - 1)
+VOXEL_CHUNK_POINTS = 1 << 22  # Points hashed per pass, bounds temporaries
+
+_HASH_MIX = np.uint64(0xBF58476D1CE4E5B9)
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def voxel_keys(xyz: np.ndarray, voxel_size: float) -> np.ndarray:
+    """
+    Pack the voxel coordinates of points into int64 keys.
+
+    Args:
+        xyz: (N, 3) points
+        voxel_size: Voxel edge length in meters
+
+    Returns:
+        (N,) int64 keys
+
+    Raises:
+        ValueError: if a point lies outside the keyable grid
+    """
+    cells = np.floor(xyz / np.float32(voxel_size)).astype(np.int64)
+    cells += VOXEL_KEY_BIAS
+    if len(cells) and (cells.min() < 0 or cells.max() >= 1 << VOXEL_KEY_BITS):
+        raise ValueError(f"Points exceed the voxel grid (+/-{VOXEL_KEY_BIAS * voxel_size:.0f}m "
+                         f"at {voxel_size}m voxels)")
+    keys = cells[:, 0] << (2 * VOXEL_KEY_BITS)
+    keys |= cells[:, 1] << VOXEL_KEY_BITS
+    keys |= cells[:, 2]
+    return keys
+
+
+def voxel_key_centers(keys: np.ndarray, voxel_size: float) -> np.ndarray:
+    """(V, 3) float64 voxel centres of the given keys."""
+    mask = (1 << VOXEL_KEY_BITS) - 1
+    cells = np.stack([keys >> (2 * VOXEL_KEY_BITS), (keys >> VOXEL_KEY_BITS) & mask, keys & mask], axis=1)
+    return (cells - VOXEL_KEY_BIAS + 0.5) * voxel_size
+
+
+def voxel_key_hash(keys: np.ndarray) -> np.ndarray:
+    """(N,) uint64 hashes of voxel keys; the high bits are the best mixed."""
+    # Packed keys differ mostly in a few bit ranges; mix them before the
+    # multiplicative hash so neighbouring voxels spread out
+    mixed = keys.astype(np.uint64)
+    mixed ^= mixed >> np.uint64(31)
+    mixed *= _HASH_MIX
+    mixed ^= mixed >> np.uint64(29)
+    mixed *= _HASH_MULTIPLIER
+    return mixed
+
+
+class VoxelHash:
+    """
+    Open-addressing hash table from voxel keys to dense voxel ids.
+
+    Lookups are vectorized: each round every pending key probes one slot,
+    keys that find an empty slot race to claim it, and the losers move on
+    to the next slot. Ids are assigned 0, 1, 2... as voxels are first
+    inserted, so per-voxel arrays can be grown alongside the table. The
+    table doubles when it passes half full.
+    """
+
+    def __init__(self, capacity: int = 1 << 16):
+        self.slot_keys = np.full(1 << max(capacity - 1, 1).bit_length(), -1, dtype=np.int64)
+        self.slot_ids = np.empty(len(self.slot_keys), dtype=np.int64)
+        self.keys = np.empty(0, dtype=np.int64)  # Voxel id -> key
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _home_slots(self, keys: np.ndarray) -> np.ndarray:
+        bits = len(self.slot_keys).bit_length() - 1
+        return (voxel_key_hash(keys) >> np.uint64(64 - bits)).astype(np.int64)
+
+    def _reserve(self, count: int):
+        """Grow the table so count more voxels keep it at most half full."""
+        needed = 2 * (self.size + count)
+        if needed > len(self.slot_keys):
+            capacity = 1 << (needed - 1).bit_length()
+            # Drop the old table before allocating the new one
+            self.slot_keys = self.slot_ids = None
+            self.slot_keys = np.full(capacity, -1, dtype=np.int64)
+            self.slot_ids = np.empty(capacity, dtype=np.int64)
+            self._place(self.keys[:self.size], np.arange(self.size))
+        if len(self.keys) < self.size + count:
+            grown = np.empty(max(self.size + count, 2 * len(self.keys)), dtype=np.int64)
+            grown[:self.size] = self.keys[:self.size]
+            self.keys = grown
+
+    def _place(self, keys: np.ndarray, ids: np.ndarray):
+        """Store distinct keys, not yet in the table, under the given ids."""
+        mask = len(self.slot_keys) - 1
+        slots = self._home_slots(keys)
+        pending = np.arange(len(keys))
+        while len(pending):
+            pending_slots = slots[pending]
+            free = self.slot_keys[pending_slots] == -1
+            self.slot_keys[pending_slots[free]] = keys[pending[free]]
+            placed = self.slot_keys[pending_slots] == keys[pending]
+            self.slot_ids[pending_slots[placed]] = ids[pending[placed]]
+            pending = pending[~placed]
+            slots[pending] = (slots[pending] + 1) & mask
+
+    def insert(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Look up keys, adding the ones not in the table yet.
+
+        Returns:
+            (N,) int64 voxel id of every key
+        """
+        self._reserve(len(keys))
+        mask = len(self.slot_keys) - 1
+        slots = self._home_slots(keys)
+        ids = np.empty(len(keys), dtype=np.int64)
+        pending = np.arange(len(keys))
+        while len(pending):
+            pending_keys = keys[pending]
+            pending_slots = slots[pending]
+            stored = self.slot_keys[pending_slots]
+            empty = stored == -1
+            if empty.any():
+                # Racing keys: the last write to each empty slot wins it
+                self.slot_keys[pending_slots[empty]] = pending_keys[empty]
+                stored = self.slot_keys[pending_slots]
+                claimed = np.flatnonzero(empty & (stored == pending_keys))
+                # One claimant per slot hands out the slot's new id
+                self.slot_ids[pending_slots[claimed]] = claimed
+                first = claimed[self.slot_ids[pending_slots[claimed]] == claimed]
+                new_ids = np.arange(self.size, self.size + len(first))
+                self.slot_ids[pending_slots[first]] = new_ids
+                self.keys[new_ids] = pending_keys[first]
+                self.size += len(first)
+            found = stored == pending_keys
+            ids[pending[found]] = self.slot_ids[pending_slots[found]]
+            pending = pending[~found]
+            slots[pending] = (slots[pending] + 1) & mask
+        return ids
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Look up keys without adding them.
+
+        Returns:
+            (N,) int64 voxel id of every key, -1 for keys not in the table
+        """
+        mask = len(self.slot_keys) - 1
+        slots = self._home_slots(keys)
+        ids = np.full(len(keys), -1, dtype=np.int64)
+        pending = np.arange(len(keys))
+        while len(pending):
+            pending_slots = slots[pending]
+            stored = self.slot_keys[pending_slots]
+            found = stored == keys[pending]
+            ids[pending[found]] = self.slot_ids[pending_slots[found]]
+            # An empty slot ends the probe sequence of a missing key
+            pending = pending[~found & (stored != -1)]
+            slots[pending] = (slots[pending] + 1) & mask
+        return ids
+
+
+def voxel_ids(
+    xyz: np.ndarray,
+    voxel_size: float,
+    chunk_size: int = VOXEL_CHUNK_POINTS
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Assign every point the dense id of its voxel.
+
+    Returns:
+        Tuple of ((N,) int64 voxel ids, (V,) int64 key of every voxel id)
+    """
+    table = VoxelHash()
+    ids = np.empty(len(xyz), dtype=np.int64)
+    for start in range(0, len(xyz), chunk_size):
+        ids[start:start + chunk_size] = table.insert(voxel_keys(xyz[start:start + chunk_size], voxel_size))
+    return ids, table.keys[:len(table)]
+
+
+@dataclass
+class VoxelStats:
+    """Per-voxel aggregates, one row per downsampled point."""
+    keys: np.ndarray  # (V,) voxel keys
+    counts: np.ndarray  # (V,) points merged into the voxel, a confidence weight
+    centroids: Optional[np.ndarray] = None  # (V, 3) float64 mean position
+    intensity: Optional[np.ndarray] = None  # (V,) float32 mean intensity
+    covariances: Optional[np.ndarray] = None  # (V, 3, 3) float64 position covariance
+    first_index: Optional[np.ndarray] = None  # (V,) input index of the voxel's first point
+
+    def __getitem__(self, index) -> 'VoxelStats':
+        return VoxelStats(
+            keys=self.keys[index],
+            counts=self.counts[index],
+            first_index=None if self.first_index is None else self.first_index[index],
+            centroids=None if self.centroids is None else self.centroids[index],
+            intensity=None if self.intensity is None else self.intensity[index],
+            covariances=None if self.covariances is None else self.covariances[index],
+        )
+
+
+def voxel_offsets(xyz: np.ndarray, ids: np.ndarray, keys: np.ndarray, voxel_size: float) -> np.ndarray:
+    """(N, 3) float32 offsets of points from their voxel centres."""
+    centers = voxel_key_centers(keys, voxel_size)
+    offsets = np.empty(xyz.shape, dtype=np.float32)
+    for axis in range(3):
+        np.subtract(xyz[:, axis], centers[ids, axis], out=offsets[:, axis], casting='unsafe')
+    return offsets
+
+
+# Upper-triangle (row, column) entries of a 3x3 covariance
+COVARIANCE_PAIRS = ((0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2))
+
+
+def voxel_aggregates(
+    points: PointBatch | np.ndarray,
+    ids: np.ndarray,
+    keys: np.ndarray,
+    voxel_size: float,
+    centroids: bool = False,
+    covariance: bool = False
+) -> VoxelStats:
+    """
+    Aggregate points per voxel with np.bincount.
+
+    Positions are accumulated as float32 offsets from the voxel centre,
+    which keeps the sums exact enough for covariances far from the origin.
+
+    Args:
+        points: PointBatch or (N, 3) array of points
+        ids: (N,) voxel id of every point
+        keys: (V,) key of every voxel id
+        voxel_size: Voxel edge length in meters
+        centroids: Compute per-voxel mean positions
+        covariance: Compute per-voxel position covariances (and centroids)
+
+    Returns:
+        VoxelStats indexed by voxel id
+    """
+    voxel_count = len(keys)
+    counts = np.bincount(ids, minlength=voxel_count)
+    stats = VoxelStats(keys=keys, counts=counts)
+
+    intensity = getattr(points, 'intensity', None)
+    if intensity is not None:
+        stats.intensity = (np.bincount(ids, weights=intensity, minlength=voxel_count) / counts).astype(np.float32)
+
+    if not (centroids or covariance):
+        return stats
+
+    offsets = voxel_offsets(point_xyz(points), ids, keys, voxel_size)
+    mean_offsets = np.empty((voxel_count, 3))
+    for axis in range(3):
+        mean_offsets[:, axis] = np.bincount(ids, weights=offsets[:, axis], minlength=voxel_count) / counts
+    stats.centroids = mean_offsets + voxel_key_centers(keys, voxel_size)
+
+    if covariance:
+        stats.covariances = np.empty((voxel_count, 3, 3))
+        for a, b in COVARIANCE_PAIRS:
+            moment = np.bincount(ids, weights=offsets[:, a] * offsets[:, b], minlength=voxel_count) / counts
+            cov = moment - mean_offsets[:, a] * mean_offsets[:, b]
+            stats.covariances[:, a, b] = cov
+            stats.covariances[:, b, a] = cov
+    return stats
+
+
+VOXEL_MODES = ('first', 'nearest', 'centroid')
+
+
+def voxelize(
+    points: PointBatch | np.ndarray,
+    voxel_size: float = 0.05,
+    mode: str = 'first',
+    covariance: bool = False
+) -> tuple[PointBatch | np.ndarray, VoxelStats]:
+    """
+    Reduce a point cloud to one point per voxel, with per-voxel statistics.
+
+    Voxels are grouped through a hash of their packed int64 keys, which is
+    linear in the number of points (no sort). Output points keep the order
+    of each voxel's first point.
+
+    Args:
+        points: PointBatch or (N, 3) array of points
+        voxel_size: Size of voxel grid cells in meters
+        mode: Point kept per voxel: 'first' (first in input order),
+            'nearest' (nearest to the voxel centre) or 'centroid' (the mean
+            position, with the other attributes of the first point)
+        covariance: Also compute per-voxel position covariances
+
+    Returns:
+        Tuple of (downsampled points, same type as the input, and their
+        VoxelStats). A PointBatch carries the voxel's mean intensity.
+        Centroids are only computed in centroid mode or with covariance.
+    """
+    if mode not in VOXEL_MODES:
+        raise ValueError(f"Unknown voxel mode {mode!r}, expected one of {VOXEL_MODES}")
+
+    xyz = point_xyz(points)
+    ids, keys = voxel_ids(xyz, voxel_size)
+    point_index = np.arange(len(xyz))
+
+    first = np.full(len(keys), len(xyz))
+    np.minimum.at(first, ids, point_index)
+    order = np.argsort(first)
+
+    if mode == 'nearest':
+        offsets = voxel_offsets(xyz, ids, keys, voxel_size)
+        distance = np.einsum('ij,ij->i', offsets, offsets)
+        nearest = np.full(len(keys), np.inf, dtype=distance.dtype)
+        np.minimum.at(nearest, ids, distance)
+        candidates = np.flatnonzero(distance == nearest[ids])
+        kept = np.full(len(keys), len(xyz))
+        np.minimum.at(kept, ids[candidates], candidates)
+    else:
+        kept = first
+
+    stats = voxel_aggregates(points, ids, keys, voxel_size, mode == 'centroid', covariance)[order]
+    stats.first_index = first[order]
+    downsampled = points[kept[order]]
+    if mode == 'centroid':
+        centroids = stats.centroids.astype(np.float32)
+        if isinstance(downsampled, PointBatch):
+            downsampled.xyz = centroids
+        else:
+            downsampled = centroids
+    if isinstance(downsampled, PointBatch) and stats.intensity is not None:
+        downsampled.intensity = stats.intensity
+    return downsampled, stats
+
+
+class VoxelAccumulator:
+    """
+    Voxel grid built incrementally, one batch of points at a time.
+
+    Absorbing frames as they are loaded keeps memory proportional to the
+    occupied voxels instead of the raw cloud. finalize() gives the same
+    result as voxelize() on the concatenation of every added batch.
+    Batches take the columns of the first one (see PointBatch.__setitem__).
+    """
+
+    def __init__(self, voxel_size: float = 0.05, mode: str = 'first', covariance: bool = False):
+        if mode not in VOXEL_MODES:
+            raise ValueError(f"Unknown voxel mode {mode!r}, expected one of {VOXEL_MODES}")
+        self.voxel_size = voxel_size
+        self.mode = mode
+        self.covariance = covariance
+        self.table = VoxelHash()
+        self.points_seen = 0
+        self.capacity = 0
+        self.kept: Optional[PointBatch | np.ndarray] = None  # Point kept per voxel
+        self.first_index = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.intensity_sum: Optional[np.ndarray] = None
+        self.nearest: Optional[np.ndarray] = None  # 'nearest': kept point's squared offset
+        self.offset_sum: Optional[np.ndarray] = None  # 'centroid' / covariance
+        self.moment_sum: Optional[np.ndarray] = None  # covariance: xx, xy, xz, yy, yz, zz
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _grow(self, size: int):
+        """Resize the per-voxel arrays to hold at least size voxels."""
+        if size <= self.capacity:
+            return
+        capacity = max(size, 2 * self.capacity, 1024)
+
+        def grown(array: Optional[np.ndarray], fill=0) -> Optional[np.ndarray]:
+            if array is None:
+                return None
+            resized = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            resized[:self.capacity] = array[:self.capacity]
+            return resized
+
+        self.first_index = grown(self.first_index)
+        self.counts = grown(self.counts)
+        self.intensity_sum = grown(self.intensity_sum)
+        self.nearest = grown(self.nearest, np.inf)
+        self.offset_sum = grown(self.offset_sum)
+        self.moment_sum = grown(self.moment_sum)
+        if isinstance(self.kept, PointBatch):
+            kept = PointBatch.allocate(capacity, self.kept.columns)
+            kept[:self.capacity] = self.kept[:self.capacity]
+            self.kept = kept
+        else:
+            self.kept = grown(self.kept)
+        self.capacity = capacity
+
+    def _start(self, points: PointBatch | np.ndarray):
+        """Set up the per-voxel arrays for the first batch's columns."""
+        if isinstance(points, PointBatch):
+            self.kept = PointBatch.allocate(0, points.columns)
+            if points.intensity is not None:
+                self.intensity_sum = np.empty(0)
+        else:
+            self.kept = np.empty((0, 3), dtype=np.float32)
+        if self.mode == 'nearest':
+            self.nearest = np.empty(0, dtype=np.float32)
+        if self.mode == 'centroid' or self.covariance:
+            self.offset_sum = np.empty((0, 3))
+        if self.covariance:
+            self.moment_sum = np.empty((0, 6))
+
+    def add(self, points: PointBatch | np.ndarray):
+        """Absorb a batch of points (PointBatch or (N, 3) array)."""
+        if len(points) == 0:
+            return
+        if self.kept is None:
+            self._start(points)
+        if isinstance(self.kept, PointBatch) and not isinstance(points, PointBatch):
+            points = PointBatch(points)
+        elif not isinstance(self.kept, PointBatch) and isinstance(points, PointBatch):
+            points = points.xyz
+        for start in range(0, len(points), VOXEL_CHUNK_POINTS):
+            self._add_chunk(points[start:start + VOXEL_CHUNK_POINTS])
+
+    def _add_chunk(self, points: PointBatch | np.ndarray):
+        xyz = point_xyz(points)
+        previous_size = len(self.table)
+        ids = self.table.insert(voxel_keys(xyz, self.voxel_size))
+        self._grow(len(self.table))
+
+        # Aggregate over the voxels this batch touches, not the whole grid
+        voxels, local = np.unique(ids, return_inverse=True)
+        local = local.ravel()
+        point_index = np.arange(len(xyz))
+        self.counts[voxels] += np.bincount(local, minlength=len(voxels))
+
+        first = np.full(len(voxels), len(xyz))
+        np.minimum.at(first, local, point_index)
+        new = voxels >= previous_size
+        self.first_index[voxels[new]] = self.points_seen + first[new]
+        if self.mode != 'nearest':
+            self.kept[voxels[new]] = points[first[new]]
+
+        if self.intensity_sum is not None:
+            intensity = points.intensity if points.intensity is not None else np.zeros(len(xyz), np.float32)
+            self.intensity_sum[voxels] += np.bincount(local, weights=intensity, minlength=len(voxels))
+
+        if self.nearest is not None or self.offset_sum is not None:
+            offsets = voxel_offsets(xyz, ids, self.table.keys, self.voxel_size)
+
+        if self.nearest is not None:
+            distance = np.einsum('ij,ij->i', offsets, offsets)
+            nearest = np.full(len(voxels), np.inf, dtype=distance.dtype)
+            np.minimum.at(nearest, local, distance)
+            candidates = np.flatnonzero(distance == nearest[local])
+            kept = np.full(len(voxels), len(xyz))
+            np.minimum.at(kept, local[candidates], candidates)
+            # Earlier batches win ties, as the first point does in voxelize
+            closer = nearest < self.nearest[voxels]
+            self.nearest[voxels[closer]] = nearest[closer]
+            self.kept[voxels[closer]] = points[kept[closer]]
+
+        if self.offset_sum is not None:
+            for axis in range(3):
+                self.offset_sum[voxels, axis] += np.bincount(local, weights=offsets[:, axis], minlength=len(voxels))
+        if self.moment_sum is not None:
+            for n, (a, b) in enumerate(COVARIANCE_PAIRS):
+                self.moment_sum[voxels, n] += np.bincount(
+                    local, weights=offsets[:, a] * offsets[:, b], minlength=len(voxels)
+                )
+
+        self.points_seen += len(xyz)
+
+    def finalize(self) -> tuple[PointBatch | np.ndarray, VoxelStats]:
+        """
+        The downsampled cloud so far and its VoxelStats, as voxelize returns them.
+        """
+        size = len(self.table)
+        if self.kept is None:
+            empty = np.empty(0, dtype=np.int64)
+            return np.empty((0, 3), dtype=np.float32), VoxelStats(keys=empty, counts=empty, first_index=empty)
+        order = np.argsort(self.first_index[:size])
+        counts = self.counts[:size][order]
+        keys = self.table.keys[:size][order]
+        stats = VoxelStats(keys=keys, counts=counts, first_index=self.first_index[:size][order])
+        if self.intensity_sum is not None:
+            stats.intensity = (self.intensity_sum[:size][order] / counts).astype(np.float32)
+        if self.offset_sum is not None:
+            mean_offsets = self.offset_sum[:size][order] / counts[:, None]
+            stats.centroids = mean_offsets + voxel_key_centers(keys, self.voxel_size)
+        if self.moment_sum is not None:
+            stats.covariances = np.empty((size, 3, 3))
+            moments = self.moment_sum[:size][order] / counts[:, None]
+            for n, (a, b) in enumerate(COVARIANCE_PAIRS):
+                cov = moments[:, n] - mean_offsets[:, a] * mean_offsets[:, b]
+                stats.covariances[:, a, b] = cov
+                stats.covariances[:, b, a] = cov
+
+        downsampled = self.kept[:size][order]
+        if self.mode == 'centroid':
+            centroids = stats.centroids.astype(np.float32)
+            if isinstance(downsampled, PointBatch):
+                downsampled.xyz = centroids
+            else:
+                downsampled = centroids
+        if isinstance(downsampled, PointBatch) and stats.intensity is not None:
+            downsampled.intensity = stats.intensity
+        return downsampled, stats
+
+
+VOXEL_BYTES_PER_POINT = 128  # Peak voxelize() working set per point, spill record included
+
+
+class SpillVoxelizer:
+    """
+    Out-of-core voxel grid for clouds that do not fit in memory.
+
+    add() hash-partitions points by voxel key into spill files on local
+    disk, so all points of a voxel land in the same file. finalize()
+    voxelizes the partitions independently on a thread pool, re-splitting
+    any partition still over its share of memory_budget on the next hash
+    bits, and merges the results back into input order. The result is
+    what voxelize() gives for the whole cloud. Memory, spill write buffers
+    included, is bounded by the budget plus the downsampled output, not by
+    the input.
+
+    Same add()/finalize() interface as VoxelAccumulator.
+    """
+    FANOUT_BITS = 6  # 64 partitions per level
+    MAX_LEVEL = 3  # Deepest re-split (16M partitions)
+
+    def __init__(
+        self,
+        voxel_size: float = 0.05,
+        mode: str = 'first',
+        covariance: bool = False,
+        memory_budget: int = 1 << 30,
+        spill_dir: Optional[str | Path] = SPILL_DIR,
+        workers: int = 0
+    ):
+        if mode not in VOXEL_MODES:
+            raise ValueError(f"Unknown voxel mode {mode!r}, expected one of {VOXEL_MODES}")
+        self.voxel_size = voxel_size
+        self.mode = mode
+        self.covariance = covariance
+        self.workers = workers or os.cpu_count() or 1
+        # Every worker holds one partition, or one block being split through
+        # a set of partition files, at a time. Their write buffers (an eighth
+        # of the worker's share) come out of the share too
+        share = memory_budget // self.workers
+        self.buffer_size = int(np.clip(share // (8 << self.FANOUT_BITS), 1 << 12, 1 << 20))
+        self.partition_points = max((share - (self.buffer_size << self.FANOUT_BITS)) // VOXEL_BYTES_PER_POINT, 1)
+        self.directory = tempfile.TemporaryDirectory(prefix='voxels-', dir=spill_dir)
+        self.columns: Optional[list[str]] = None  # None for plain (N, 3) arrays
+        self.dtype: Optional[np.dtype] = None
+        self.files = None
+        self.points_seen = 0
+        self.partitions = 0  # Partitions voxelized by finalize()
+
+    def _start(self, points: PointBatch | np.ndarray):
+        """Set up the spill record layout from the first batch's columns."""
+        self.columns = points.columns if isinstance(points, PointBatch) else None
+        fields = [
+            (name, PointBatch.COLUMNS[name][0], PointBatch.COLUMNS[name][1])
+            for name in (self.columns or ['xyz'])
+        ]
+        self.dtype = np.dtype(fields + [('index', np.int64)])
+        self.files = self._open_partitions('p')
+
+    def _open_partitions(self, prefix: str) -> list:
+        paths = [Path(self.directory.name) / f'{prefix}{i}.bin' for i in range(1 << self.FANOUT_BITS)]
+        return [open(path, 'wb', buffering=self.buffer_size) for path in paths]
+
+    def _partition(self, xyz: np.ndarray, level: int) -> np.ndarray:
+        """(N,) partition of every point at a split level (0 = first split)."""
+        # Low hash bits: VoxelHash slots come from the high ones, and a
+        # partition sharing those would crowd one corner of its table
+        shift = np.uint64(self.FANOUT_BITS * level)
+        hashes = voxel_key_hash(voxel_keys(xyz, self.voxel_size))
+        return ((hashes >> shift) & np.uint64((1 << self.FANOUT_BITS) - 1)).astype(np.intp)
+
+    @staticmethod
+    def _write(records: np.ndarray, partition: np.ndarray, files: list):
+        order = np.argsort(partition, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(partition, minlength=len(files)))])
+        records = records[order]
+        for i, file in enumerate(files):
+            if bounds[i + 1] > bounds[i]:
+                file.write(records[bounds[i]:bounds[i + 1]])
+
+    def add(self, points: PointBatch | np.ndarray):
+        """Spill a batch of points (PointBatch or (N, 3) array) to the partitions."""
+        if len(points) == 0:
+            return
+        if self.dtype is None:
+            self._start(points)
+        for start in range(0, len(points), self.partition_points):
+            chunk = points[start:start + self.partition_points]
+            records = np.zeros(len(chunk), dtype=self.dtype)
+            if self.columns is None:
+                records['xyz'] = point_xyz(chunk)
+            else:
+                if not isinstance(chunk, PointBatch):
+                    chunk = PointBatch(chunk)
+                for name in self.columns:
+                    column = getattr(chunk, name)
+                    if column is not None:
+                        records[name] = column
+            records['index'] = np.arange(self.points_seen, self.points_seen + len(chunk))
+            self._write(records, self._partition(records['xyz'], 0), self.files)
+            self.points_seen += len(chunk)
+
+    def _records_batch(self, records: np.ndarray) -> PointBatch | np.ndarray:
+        if self.columns is None:
+            return records['xyz']
+        return PointBatch(**{name: records[name] for name in self.columns})
+
+    def _voxelize_partition(self, path: Path, level: int = 0) -> list[tuple[PointBatch | np.ndarray, VoxelStats]]:
+        """Voxelize one spill file, splitting it first if it is over budget."""
+        count = path.stat().st_size // self.dtype.itemsize
+        if count == 0:
+            path.unlink()
+            return []
+
+        if count > self.partition_points and level < self.MAX_LEVEL:
+            # Too big for this worker's share: split on the next hash bits,
+            # a block at a time
+            files = self._open_partitions(f'{path.stem}-')
+            try:
+                for start in range(0, count, self.partition_points):
+                    records = np.fromfile(path, dtype=self.dtype, count=self.partition_points,
+                                          offset=start * self.dtype.itemsize)
+                    self._write(records, self._partition(records['xyz'], level + 1), files)
+            finally:
+                for file in files:
+                    file.close()
+            path.unlink()
+            results = []
+            for file in files:
+                results.extend(self._voxelize_partition(Path(file.name), level + 1))
+            return results
+
+        records = np.fromfile(path, dtype=self.dtype)
+        path.unlink()
+        downsampled, stats = voxelize(self._records_batch(records), self.voxel_size, self.mode, self.covariance)
+        stats.first_index = records['index'][stats.first_index]
+        return [(downsampled, stats)]
+
+    def finalize(self) -> tuple[PointBatch | np.ndarray, VoxelStats]:
+        """
+        The downsampled cloud and its VoxelStats, as voxelize returns them.
+
+        Removes the spill files.
+        """
+        results = []
+        try:
+            if self.files is not None:
+                for file in self.files:
+                    file.close()
+                paths = [Path(file.name) for file in self.files]
+                for partition in map_ordered(self._voxelize_partition, paths, self.workers):
+                    results.extend(partition)
+        finally:
+            self.directory.cleanup()
+        self.partitions = len(results)
+
+        if not results:
+            empty = np.empty(0, dtype=np.int64)
+            downsampled = PointBatch.allocate(0, self.columns) if self.columns is not None \
+                else np.empty((0, 3), dtype=np.float32)
+            return downsampled, VoxelStats(keys=empty, counts=empty, first_index=empty)
+
+        # Partitions back into the order of each voxel's first point
+        stats = VoxelStats(**{
+            name: np.concatenate([getattr(partition_stats, name) for _, partition_stats in results])
+            if getattr(results[0][1], name) is not None else None
+            for name in VoxelStats.__dataclass_fields__
+        })
+        if self.columns is None:
+            downsampled = np.concatenate([points for points, _ in results])
+        else:
+            downsampled = PointBatch(**{
+                name: np.concatenate([getattr(points, name) for points, _ in results])
+                for name in self.columns
+            })
+        order = np.argsort(stats.first_index)
+        return downsampled[order], stats[order]
+
+
+def voxel_downsample(
+    points: PointBatch | np.ndarray,
+    voxel_size: float = 0.05,
+    mode: str = 'first',
+    memory_budget: Optional[int] = None
+) -> PointBatch | np.ndarray:
+    """
+    Downsample point cloud using voxel grid filter.
     
-    if not poses_file.exists():
-        logger.warning(f"No poses.csv found at {poses_file}")
-        return poses
+    Args:
+        points: PointBatch or (N, 3) array of points
+        voxel_size: Size of voxel grid cells in meters
+        mode: Point kept per voxel ('first', 'nearest' or 'centroid'), see voxelize
+        memory_budget: Working memory in bytes; clouds that need more are
+            voxelized out of core (see SpillVoxelizer). None = unbounded
     
-    with open(poses_file, 'r') as f:
-        next(f)  # Skip header
-        for line in f:
-            parts = line.strip().split(',')
-            if len(parts) >= 8:
-                try:
-                    poses.append(Pose(
-                        timestamp=float(parts[0]),
-                        position=np.array([float(parts[1]), float(parts[2]), float(parts[3])]),
-                        rotation=np.array([float(parts[4]), float(parts[5]), float(parts[6]), float(parts[7])])
-                    ))
-                except ValueError as e:
-                    logger.warning(f"Failed to parse pose line: {e}")
+    Returns:
+        Downsampled point cloud, same type as the input
+    """
+    if len(points) == 0:
+        return points
     
-    logger.info(f"Loaded {len(poses)} poses from poses.csv")
-    return poses
+    if memory_budget is not None and len(points) * VOXEL_BYTES_PER_POINT > memory_budget:
+        voxelizer = SpillVoxelizer(voxel_size, mode, memory_budget=memory_budget)
+        voxelizer.add(points)
+        downsampled, stats = voxelizer.finalize()
+        method = f", out of core in {voxelizer.partitions} partitions"
+    else:
+        downsampled, stats = voxelize(points, voxel_size, mode)
+        method = ""
+    logger.info(f"Voxel downsample: {len(points)} -> {len(downsampled)} points "
+                f"(voxel_size={voxel_size}m, mode={mode}, "
+                f"{stats.counts.mean():.1f} points/voxel{method})")
+    return downsampled
+
+
+OUTLIER_MODES = ('statistical', 'radius')
+OUTLIER_CHUNK_POINTS = 1 << 16  # Points per neighbour query (~22 MB of buffers at k=20)
+NEIGHBOR_PAIR_CHUNK = 1 << 20  # Candidate pairs per distance pass (~40 MB of temporaries)
+
+# (27, 3) cell offsets of a cell's 3x3x3 neighbourhood, itself included
+NEIGHBOR_OFFSETS = np.stack(np.meshgrid(*[np.arange(-1, 2)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+
 
+class VoxelNeighborIndex:
+    """
+    Fixed-radius neighbour index over a hash of radius-sized cells.
 
-def interpolate_pose(poses: list[Pose], timestamp: float) -> Optional[Pose]:
+    Points are bucketed into cells with an edge of the query radius and
+    stored cell by cell; the occupied cells are keyed in a VoxelHash.
+    Every point within the radius of a query lies in the query's cell or
+    one of its 26 neighbours, so a lookup hashes 27 cell keys and measures
+    distances only to their points. Building is a hash pass and a sort of
+    dense cell ids, and on voxelized clouds, where a cell holds a handful
+    of points, queries are faster than a KD-tree.
     """
-    Interpolate pose at a given timestamp using linear interpolation.
+
+    def __init__(self, xyz: np.ndarray, radius: float, chunk_size: int = VOXEL_CHUNK_POINTS):
+        self.radius = radius
+        self.table = VoxelHash()
+        cells = np.empty(len(xyz), dtype=np.int64)
+        for start in range(0, len(xyz), chunk_size):
+            cells[start:start + chunk_size] = self.table.insert(voxel_keys(xyz[start:start + chunk_size], radius))
+        self.order = np.argsort(cells, kind='stable')  # Sorted position -> input index
+        self.cells = cells[self.order]
+        self.xyz = xyz[self.order]
+        self.starts = np.zeros(len(self.table) + 1, dtype=np.int64)  # Cell id -> first sorted position
+        np.cumsum(np.bincount(cells, minlength=len(self.table)), out=self.starts[1:])
+
+    def __len__(self) -> int:
+        return len(self.xyz)
+
+    def neighbor_cells(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Look up the 3x3x3 cell neighbourhoods of cell keys.
+
+        Returns:
+            (M, 27) int64 cell ids, -1 for empty cells
+        """
+        bits = VOXEL_KEY_BITS
+        mask = (1 << bits) - 1
+        cells = np.stack([keys >> (2 * bits), (keys >> bits) & mask, keys & mask], axis=1)
+        neighbors = cells[:, None, :] + NEIGHBOR_OFFSETS
+        # Cells off the edge of the grid are empty
+        valid = ((neighbors >= 0) & (neighbors <= mask)).all(axis=2)
+        neighbor_keys = neighbors[..., 0] << (2 * bits)
+        neighbor_keys |= neighbors[..., 1] << bits
+        neighbor_keys |= neighbors[..., 2]
+        ids = np.full(valid.shape, -1, dtype=np.int64)
+        ids[valid] = self.table.lookup(neighbor_keys[valid])
+        return ids
+
+    def _count_within(self, query: np.ndarray, neighbors: np.ndarray) -> np.ndarray:
+        """Indexed points within the radius of each query point, given its neighbour cells."""
+        counts = np.zeros(len(query), dtype=np.int64)
+        entries = np.flatnonzero(neighbors.ravel() >= 0)
+        if not len(entries):
+            return counts
+        cells = neighbors.ravel()[entries]
+        sizes = self.starts[cells + 1] - self.starts[cells]
+        ends = np.cumsum(sizes)
+        # Expand (query, cell) entries into candidate pairs a bounded batch at a time
+        cuts = np.searchsorted(ends, np.arange(NEIGHBOR_PAIR_CHUNK, ends[-1], NEIGHBOR_PAIR_CHUNK))
+        bounds = np.unique(np.concatenate([[0], cuts + 1, [len(entries)]]))
+        radius_sq = np.float32(self.radius) ** 2
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            batch_sizes = sizes[lo:hi]
+            first_pair = ends[lo] - sizes[lo]
+            owners = np.repeat(entries[lo:hi] // neighbors.shape[1], batch_sizes)
+            targets = np.repeat(self.starts[cells[lo:hi]] - (ends[lo:hi] - batch_sizes), batch_sizes)
+            targets += np.arange(first_pair, ends[hi - 1])
+            delta = self.xyz[targets] - query[owners]
+            within = np.einsum('ij,ij->i', delta, delta) <= radius_sq
+            counts += np.bincount(owners[within], minlength=len(query))
+        return counts
+
+    def count_neighbors(
+        self,
+        xyz: Optional[np.ndarray] = None,
+        workers: int = 0,
+        chunk_size: int = OUTLIER_CHUNK_POINTS
+    ) -> np.ndarray:
+        """
+        Count indexed points within the radius of query points.
+
+        Args:
+            xyz: (M, 3) query points, None for the indexed points themselves
+                (each then counts itself)
+            workers: Query threads (0 = one per CPU)
+            chunk_size: Query points per task
+
+        Returns:
+            (M,) int64 neighbour counts, in query order
+        """
+        if xyz is None:
+            # Sorted points share cells, so each chunk looks up its distinct cells once
+            query = self.xyz
+            def neighbors(start: int) -> np.ndarray:
+                chunk_cells, inverse = np.unique(self.cells[start:start + chunk_size], return_inverse=True)
+                return self.neighbor_cells(self.table.keys[chunk_cells])[inverse]
+        else:
+            query = xyz
+            def neighbors(start: int) -> np.ndarray:
+                return self.neighbor_cells(voxel_keys(query[start:start + chunk_size], self.radius))
+        counts = np.empty(len(query), dtype=np.int64)
+
+        def count(start: int):
+            counts[start:start + chunk_size] = self._count_within(query[start:start + chunk_size], neighbors(start))
+
+        for _ in map_ordered(count, range(0, len(query), chunk_size), workers):
+            pass
+        if xyz is None:
+            counts[self.order] = counts.copy()
+        return counts
+
+
+def remove_statistical_outliers(
+    points: PointBatch | np.ndarray, 
+    k_neighbors: int = 20, 
+    std_ratio: float = 2.0,
+    workers: int = 0,
+    chunk_size: int = OUTLIER_CHUNK_POINTS,
+    fallback_radius: float = 0.2,
+    fallback_min_neighbors: int = 8
+) -> PointBatch | np.ndarray:
     """
-    if not poses:
-        return None
+    Remove statistical outliers based on mean distance to k nearest neighbors.
     
-    # Find bracketing poses
-    prev_pose = None
-    next_pose = None
+    Points with mean distance greater than (global_mean + std_ratio * global_std)
+    are considered outliers.
     
-    for pose in poses:
-        if pose.timestamp <= timestamp:
-            prev_pose = pose
-        elif pose.timestamp > timestamp and next_pose is None:
-            next_pose = pose
-            break
+    The KD-tree is queried in chunks on a thread pool (the query releases
+    the GIL), so only workers * chunk_size neighbour rows exist at a time.
+    Each point keeps just its float32 mean distance; the global mean and
+    std come from running sums over the chunks.
     
-    if prev_pose is None:
-        return poses[0] if poses else None
-    if next_pose is None:
-        return prev_pose
+    Args:
+        points: PointBatch or (N, 3) array of points
+        k_neighbors: Number of neighbors to consider
+        std_ratio: Standard deviation multiplier for outlier threshold
+        workers: Query threads (0 = one per CPU)
+        chunk_size: Points per query
+        fallback_radius: Radius of the radius outlier removal used instead
+            when scipy is missing
+        fallback_min_neighbors: Neighbours that fallback keeps a point with
     
-    # Linear interpolation
-    dt = next_pose.timestamp - prev_pose.timestamp
-    if dt < 1e-6:
-        return prev_pose
+    Returns:
+        Filtered point cloud, same type as the input
+    """
+    if len(points) < k_neighbors + 1:
+        return points
     
-    t = (timestamp - prev_pose.timestamp) / dt
-    t = np.clip(t, 0.0, 1.0)
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        logger.warning("scipy not available, falling back to radius outlier removal")
+        return remove_radius_outliers(points, fallback_radius, fallback_min_neighbors, workers, chunk_size)
     
-    # Interpolate position
-    position = prev_pose.position * (1 - t) + next_pose.position * t
+    # Build KD-tree
+    xyz = point_xyz(points)
+    tree = cKDTree(xyz)
+    mean_distances = np.empty(len(xyz), dtype=np.float32)
     
-    # SLERP for quaternion (simplified: linear for small angles)
-    rotation = prev_pose.rotation * (1 - t) + next_pose.rotation * t
-    rotation = rotation / np.linalg.norm(rotation)  # Normalize
+    def query(start: int) -> tuple[float, float]:
+        # Query k+1 neighbors (includes self, at distance 0)
+        distances, _ = tree.query(xyz[start:start + chunk_size], k=k_neighbors + 1)
+        chunk_means = mean_distances[start:start + chunk_size]
+        np.mean(distances[:, 1:], axis=1, out=chunk_means, dtype=np.float64)
+        chunk_means64 = chunk_means.astype(np.float64)
+        return chunk_means64.sum(), np.dot(chunk_means64, chunk_means64)
     
-    return Pose(timestamp=timestamp, position=position, rotation=rotation)
-
-
-def quaternion_to_matrix(q: np.ndarray) -> np.ndarray:
-    """Convert quaternion [qx, qy, qz, qw] to 3x3 rotation matrix."""
-    qx, qy, qz, qw = q
+    # Compute threshold from running sums
+    total = total_squares = 0.0
+    for chunk_sum, chunk_squares in map_ordered(query, range(0, len(xyz), chunk_size), workers):
+        total += chunk_sum
+        total_squares += chunk_squares
+    global_mean = total / len(xyz)
+    global_std = np.sqrt(max(total_squares / len(xyz) - global_mean ** 2, 0.0))
+    threshold = global_mean + std_ratio * global_std
     
-    return np.array([
-        [1 - 2*qy*qy - 2*qz*qz, 2*qx*qy - 2*qz*qw, 2*qx*qz + 2*qy*qw],
-        [2*qx*qy + 2*qz*qw, 1 - 2*qx*qx - 2*qz*qz, 2*qy*qz - 2*qx*qw],
-        [2*qx*qz - 2*qy*qw, 2*qy*qz + 2*qx*qw, 1 - 2*qx*qx - 2*qy*qy]
-    ])
+    # Filter
+    mask = mean_distances < threshold
+    filtered = points[mask]
+    
+    logger.info(f"Outlier removal: {len(points)} -> {len(filtered)} points "
+                f"(threshold={threshold:.4f}m)")
+    return filtered
 
 
-def transform_points_to_world(points: np.ndarray, pose: Pose) -> np.ndarray:
+def remove_radius_outliers(
+    points: PointBatch | np.ndarray,
+    radius: float = 0.2,
+    min_neighbors: int = 8,
+    workers: int = 0,
+    chunk_size: int = OUTLIER_CHUNK_POINTS
+) -> PointBatch | np.ndarray:
     """
-    Transform points from sensor frame to world frame using pose.
+    Remove points with fewer than min_neighbors other points within radius.
+    
+    Neighbours are counted on a VoxelNeighborIndex, which needs only numpy.
     
     Args:
-        points: (N, 3) array of points in sensor frame
-        pose: Pose with position and rotation
+        points: PointBatch or (N, 3) array of points
+        radius: Neighbourhood radius in meters
+        min_neighbors: Neighbours a point needs to be kept
+        workers: Query threads (0 = one per CPU)
+        chunk_size: Points per query
     
     Returns:
-        (N, 3) array of points in world frame
+        Filtered point cloud, same type as the input
     """
     if len(points) == 0:
         return points
     
-    # Build rotation matrix from quaternion
-    R = quaternion_to_matrix(pose.rotation)
-    
-    # Transform: world_point = R @ sensor_point + position
-    world_points = (R @ points.T).T + pose.position
+    index = VoxelNeighborIndex(point_xyz(points), radius)
+    # Every point counts itself
+    mask = index.count_neighbors(workers=workers, chunk_size=chunk_size) > min_neighbors
+    filtered = points[mask]
     
-    return world_points
+    logger.info(f"Radius outlier removal: {len(points)} -> {len(filtered)} points "
+                f"(radius={radius}m, min_neighbors={min_neighbors})")
+    return filtered
+
 
+RANSAC_SAMPLE_POINTS = 1 << 16  # Subsample plane hypotheses are scored on
+RANSAC_BATCH = 64  # Hypotheses scored per pass (~32 MB of distances)
 
-def load_session_data(session_path: Path) -> tuple[np.ndarray, list[dict], list[Path]]:
+
+def fit_plane(xyz: np.ndarray) -> tuple[np.ndarray, float]:
     """
-    Load session data for splatting.
-    
+    Least-squares plane through points.
+
     Returns:
-        points: (N, 3) array of LiDAR points in world frame
-        poses: List of camera poses with timestamps
-        images: List of image paths
+        Tuple of (unit normal with non-negative z, offset d), the plane
+        being normal . p + d = 0
     """
-    logger.info(f"Loading session from {session_path}")
+    centroid = xyz.mean(axis=0, dtype=np.float64)
+    centered = xyz - centroid
+    # The normal is the direction of least variance
+    _, vectors = np.linalg.eigh(centered.T @ centered)
+    normal = vectors[:, 0]
+    if normal[2] < 0:
+        normal = -normal
+    return normal, -float(normal @ centroid)
+
+
+def ransac_ground_plane(
+    xyz: np.ndarray,
+    ground_threshold: float = 0.1,
+    max_iterations: int = 1000,
+    confidence: float = 0.99,
+    min_normal_z: float = 0.8,
+    sample_size: int = RANSAC_SAMPLE_POINTS,
+    seed: Optional[int] = 0
+) -> Optional[tuple[np.ndarray, float]]:
+    """
+    Fit the dominant near-horizontal plane with batched, adaptive RANSAC.
     
-    # Load poses first
-    poses = load_poses(session_path)
+    Hypotheses are scored RANSAC_BATCH at a time against a random subsample
+    of the cloud. Sampling stops once enough hypotheses have been drawn to
+    hit an all-inlier triple with the given confidence, at the best inlier
+    ratio so far. The winner is refit by least squares on its inliers.
     
-    # Load LiDAR timestamps
-    lidar_dir = session_path / 'lidar'
-    lidar_timestamps = {}
-    
-    timestamps_file = lidar_dir / 'timestamps.csv' if lidar_dir.exists() else None
-    if timestamps_file and timestamps_file.exists():
-        with open(timestamps_file, 'r') as f:
-            next(f)  # Skip header
-            for line in f:
-                parts = line.strip().split(',')
-                if len(parts) >= 2:
-                    frame_num = int(parts[0])
-                    timestamp = float(parts[1])
-                    lidar_timestamps[frame_num] = timestamp
+    Args:
+        xyz: (N, 3) points
+        ground_threshold: Distance threshold for inliers
+        max_iterations: Most hypotheses to score
+        confidence: Probability of having drawn an all-inlier triple
+        min_normal_z: Smallest normal z component (cosine of the tilt)
+            of a ground plane
+        sample_size: Points hypotheses are scored on
+        seed: Random seed, for reproducible planes (None = unseeded)
     
-    # Load LiDAR points with pose transformation
-    points = []
+    Returns:
+        Tuple of (unit normal, offset d), or None if no plane was found
+    """
+    if len(xyz) < 3:
+        return None
+    
+    rng = np.random.default_rng(seed)
+    if len(xyz) > sample_size:
+        sample = xyz[np.sort(rng.choice(len(xyz), sample_size, replace=False))]
+    else:
+        sample = xyz
+    sample = sample.astype(np.float64)
     
-    if lidar_dir.exists():
-        pcd_files = sorted(lidar_dir.glob('*.pcd'))
-        logger.info(f"Found {len(pcd_files)} LiDAR frames")
+    best_plane = None
+    best_count = 0
+    tried = 0
+    needed = max_iterations
+    while tried < min(needed, max_iterations):
+        batch = min(RANSAC_BATCH, max_iterations - tried)
+        tried += batch
         
-        for pcd_file in pcd_files:
-            frame_points = load_pcd(pcd_file)
-            if frame_points is None or len(frame_points) == 0:
-                continue
-            
-            # Get frame number from filename
-            try:
-                frame_num = int(pcd_file.stem)
-            except ValueError:
-                continue
-            
-            # Get timestamp and interpolate pose
-            timestamp = lidar_timestamps.get(frame_num)
-            if timestamp is not None and poses:
-                pose = interpolate_pose(poses, timestamp)
-                if pose is not None:
-                    # Transform points to world frame
-                    frame_points = transform_points_to_world(frame_points, pose)
-            
-            points.append(frame_points)
+        # Fit planes through random triples: ax + by + cz + d = 0
+        triples = sample[rng.integers(0, len(sample), (batch, 3))]
+        normals = np.cross(triples[:, 1] - triples[:, 0], triples[:, 2] - triples[:, 0])
+        norms = np.linalg.norm(normals, axis=1)
+        valid = norms > 1e-6
+        normals[valid] /= norms[valid, None]
+        # Only approximately horizontal planes (normal ~ [0, 0, 1])
+        valid &= np.abs(normals[:, 2]) >= min_normal_z
+        offsets = -np.einsum('ij,ij->i', normals, triples[:, 0])
         
-        if points:
-            points = np.vstack(points)
-            logger.info(f"Loaded {len(points)} total points (world frame)")
-        else:
-            points = np.zeros((0, 3))
-    else:
-        points = np.zeros((0, 3))
-        logger.warning("No LiDAR directory found")
+        # Count inliers of every hypothesis at once
+        distances = sample @ normals.T
+        distances += offsets
+        counts = np.count_nonzero(np.abs(distances) < ground_threshold, axis=0)
+        counts[~valid] = 0
+        
+        best = int(np.argmax(counts))
+        if counts[best] > best_count:
+            best_count = int(counts[best])
+            best_plane = (normals[best], offsets[best])
+            inlier_ratio = best_count / len(sample)
+            if inlier_ratio >= 1.0:
+                break
+            needed = int(np.ceil(np.log(1 - confidence) / np.log(1 - inlier_ratio ** 3)))
     
-    # Load camera images
-    camera_dir = session_path / 'camera'
-    images = []
+    if best_plane is None:
+        return None
     
-    if camera_dir.exists():
-        images = sorted(camera_dir.glob('*.jpg'))
-        logger.info(f"Found {len(images)} camera frames")
-    else:
-        logger.warning("No camera directory found")
+    # Refine on the winner's inliers
+    normal, offset = best_plane
+    inliers = sample[np.abs(sample @ normal + offset) < ground_threshold]
+    if len(inliers) >= 3:
+        normal, offset = fit_plane(inliers)
     
-    # Build camera pose list from poses
-    camera_poses = []
-    camera_timestamps_file = camera_dir / 'timestamps.csv' if camera_dir.exists() else None
-    
-    if camera_timestamps_file and camera_timestamps_file.exists():
-        with open(camera_timestamps_file, 'r') as f:
-            next(f)  # Skip header
-            for line in f:
-                parts = line.strip().split(',')
-                if len(parts) >= 2:
-                    frame_num = int(parts[0])
-                    timestamp = float(parts[1])
-                    
-                    # Interpolate pose for this camera frame
-                    pose = interpolate_pose(poses, timestamp) if poses else None
-                    if pose is not None:
-                        camera_poses.append({
-                            'frame': frame_num,
-                            'timestamp': timestamp,
-                            'position': pose.position.tolist(),
-                            'rotation': pose.rotation.tolist()
-                        })
-                    else:
-                        camera_poses.append({
-                            'frame': frame_num,
-                            'timestamp': timestamp,
-                            'position': [0.0, 0.0, 0.0],
-                            'rotation': [0.0, 0.0, 0.0, 1.0]
-                        })
-    
-    return points, camera_poses, images
-
-
-def load_pcd(path: Path) -> Optional[np.ndarray]:
-    """Load points from a PCD file."""
-    try:
-        points = []
-        with open(path, 'r') as f:
-            in_data = False
-            for line in f:
-                if in_data:
-                    parts = line.strip().split()
-                    if len(parts) >= 3:
-                        points.append([float(parts[0]), float(parts[1]), float(parts[2])])
-                elif line.startswith('DATA'):
-                    in_data = True
-        
-        return np.array(points, dtype=np.float32) if points else None
-    except Exception as e:
-        logger.warning(f"Failed to load PCD {path}: {e}")
-        return None
+    logger.debug(f"RANSAC: {tried} hypotheses, {best_count}/{len(sample)} sample inliers")
+    return normal, offset
 
 
-# =============================================================================
-# Point Cloud Preprocessing
-# =============================================================================
+def ground_plane_mask(
+    xyz: np.ndarray,
+    ground_threshold: float = 0.1,
+    ransac_iterations: int = 1000,
+    seed: Optional[int] = 0
+) -> np.ndarray:
+    """
+    (N,) bool ground labels against one global RANSAC plane.
 
-def voxel_downsample(points: np.ndarray, voxel_size: float = 0.05) -> np.ndarray:
+    All False (with a warning) if no ground plane is found.
     """
-    Downsample point cloud using voxel grid filter.
+    plane = ransac_ground_plane(xyz, ground_threshold, ransac_iterations, seed=seed)
+    if plane is None:
+        if len(xyz) >= 3:
+            logger.warning("No ground plane found")
+        return np.zeros(len(xyz), dtype=bool)
+    
+    normal, offset = plane
+    return np.abs(xyz @ normal.astype(xyz.dtype) + offset) < ground_threshold
+
+
+def filter_ground_plane(
+    points: PointBatch | np.ndarray, 
+    ground_threshold: float = 0.1,
+    ransac_iterations: int = 1000,
+    seed: Optional[int] = 0
+) -> tuple[PointBatch | np.ndarray, PointBatch | np.ndarray]:
+    """
+    Separate ground plane from other points using RANSAC.
+    
+    The plane comes from ransac_ground_plane, so the full cloud is only
+    read once, to label points against the refined plane.
     
     Args:
-        points: (N, 3) array of points
-        voxel_size: Size of voxel grid cells in meters
+        points: PointBatch or (N, 3) array of points
+        ground_threshold: Distance threshold for inliers
+        ransac_iterations: Most RANSAC hypotheses (sampling stops adaptively)
+        seed: Random seed (None = unseeded)
     
     Returns:
-        Downsampled point cloud
+        Tuple of (non_ground_points, ground_points), same type as the input
     """
-    if len(points) == 0:
-        return points
+    mask = ground_plane_mask(point_xyz(points), ground_threshold, ransac_iterations, seed)
+    if not mask.any():
+        return points, points[:0]
     
-    # Quantize points to voxel grid
-    voxel_indices = np.floor(points / voxel_size).astype(np.int32)
+    ground_points = points[mask]
+    non_ground_points = points[~mask]
     
-    # Use unique voxels
-    _, unique_indices = np.unique(
-        voxel_indices.view(np.dtype((np.void, voxel_indices.dtype.itemsize * 3))),
-        return_index=True
-    )
+    logger.info(f"Ground filtering: {len(ground_points)} ground, "
+                f"{len(non_ground_points)} non-ground points")
     
-    downsampled = points[unique_indices]
-    logger.info(f"Voxel downsample: {len(points)} -> {len(downsampled)} points (voxel_size={voxel_size}m)")
-    return downsampled
+    return non_ground_points, ground_points
 
 
-def remove_statistical_outliers(
-    points: np.ndarray, 
-    k_neighbors: int = 20, 
-    std_ratio: float = 2.0
+GROUND_MODES = ('plane', 'tiled')
+GROUND_TILE_SAMPLE_POINTS = 1 << 13  # Points per tile shipped to a worker for its plane fit
+GROUND_TILE_MIN_POINTS = 100  # Fewer sampled points leave a tile without a plane
+
+
+def _fit_tile_plane(task: tuple[np.ndarray, float, int]) -> Optional[tuple[np.ndarray, float]]:
+    """Process pool entry point: RANSAC plane of one tile's sample."""
+    xyz, ground_threshold, seed = task
+    return ransac_ground_plane(xyz, ground_threshold, seed=seed)
+
+
+def ground_tile_mask(
+    xyz: np.ndarray,
+    tile_size: float = 10.0,
+    overlap: float = 2.0,
+    ground_threshold: float = 0.1,
+    workers: int = 0,
+    seed: Optional[int] = 0
 ) -> np.ndarray:
     """
-    Remove statistical outliers based on mean distance to k nearest neighbors.
+    (N,) bool ground labels against a piecewise-planar terrain model.
     
-    Points with mean distance greater than (global_mean + std_ratio * global_std)
-    are considered outliers.
+    The XY extent is cut into square tiles. Each tile gets its own RANSAC
+    plane, fit on a random sample of the points within overlap of the
+    tile, so neighbouring planes agree along the shared border. Plane fits
+    run in a process pool. Every point is then compared with the terrain
+    height blended bilinearly from the planes of the four nearest tile
+    centres, so the model follows slopes, curb cuts and hills without
+    steps at tile borders. Tiles without a plane (too few points, or no
+    near-horizontal surface) are left out of the blend.
     
     Args:
-        points: (N, 3) array of points
-        k_neighbors: Number of neighbors to consider
-        std_ratio: Standard deviation multiplier for outlier threshold
+        xyz: (N, 3) points
+        tile_size: Tile edge length in meters
+        overlap: Margin around each tile included in its fit, in meters
+        ground_threshold: Height above or below the terrain counted as ground
+        workers: Plane-fitting processes and labelling threads (0 = one per CPU)
+        seed: Random seed (None = unseeded)
     
     Returns:
-        Filtered point cloud
+        Ground labels, all False (with a warning) if no tile has a plane
     """
-    if len(points) < k_neighbors + 1:
-        return points
+    if len(xyz) < 3:
+        return np.zeros(len(xyz), dtype=bool)
     
-    try:
-        from scipy.spatial import cKDTree
-    except ImportError:
-        logger.warning("scipy not available, skipping outlier removal")
-        return points
+    workers = workers or os.cpu_count() or 1
+    corner = xyz[:, :2].min(axis=0).astype(np.float64)
+    shape = (np.floor((xyz[:, :2].max(axis=0) - corner) / tile_size).astype(np.int64) + 1)
     
-    # Build KD-tree
-    tree = cKDTree(points)
+    # Random sample with enough points for every occupied tile; its order is
+    # random, so the first points of a tile are a random subset of it
+    rng = np.random.default_rng(seed)
+    tile_count = int(shape[0] * shape[1])
+    sample = xyz[rng.permutation(len(xyz))[:GROUND_TILE_SAMPLE_POINTS * tile_count]]
     
-    # Query k+1 neighbors (includes self)
-    distances, _ = tree.query(points, k=k_neighbors + 1)
+    # A sample point belongs to every tile whose overlapping box contains it
+    low = np.floor((sample[:, :2] - corner - overlap) / tile_size).astype(np.int64)
+    high = np.floor((sample[:, :2] - corner + overlap) / tile_size).astype(np.int64)
+    members, tiles = [], []
+    for dx in range(int(np.ceil(2 * overlap / tile_size)) + 1):
+        for dy in range(int(np.ceil(2 * overlap / tile_size)) + 1):
+            tile = low + (dx, dy)
+            inside = (tile <= high).all(axis=1) & (tile >= 0).all(axis=1) & (tile < shape).all(axis=1)
+            members.append(np.flatnonzero(inside))
+            tiles.append(tile[inside, 0] * shape[1] + tile[inside, 1])
+    members = np.concatenate(members)
+    tiles = np.concatenate(tiles)
+    order = np.argsort(tiles, kind='stable')
+    members, tiles = members[order], tiles[order]
+    tile_ids, starts, counts = np.unique(tiles, return_index=True, return_counts=True)
+    fitted = counts >= GROUND_TILE_MIN_POINTS
+    tasks = [
+        (sample[members[start:start + min(count, GROUND_TILE_SAMPLE_POINTS)]], ground_threshold,
+         None if seed is None else seed + int(tile_id))
+        for tile_id, start, count in zip(tile_ids[fitted], starts[fitted], counts[fitted])
+    ]
+    del sample, members, tiles
     
-    # Mean distance to neighbors (exclude self which is distance 0)
-    mean_distances = np.mean(distances[:, 1:], axis=1)
+    if workers == 1 or len(tasks) < 2:
+        planes = list(map(_fit_tile_plane, tasks))
+    else:
+        # Spawned, not forked: the watcher runs threads
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(min(workers, len(tasks)), mp_context=context) as pool:
+            planes = list(pool.map(_fit_tile_plane, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
     
-    # Compute threshold
-    global_mean = np.mean(mean_distances)
-    global_std = np.std(mean_distances)
-    threshold = global_mean + std_ratio * global_std
+    # Terrain planes as z = a x + b y + c per tile, NaN where there is none
+    terrain = np.full((tile_count, 3), np.nan)
+    for tile_id, plane in zip(tile_ids[fitted], planes):
+        if plane is not None:
+            normal, offset = plane
+            terrain[tile_id] = -np.array([normal[0], normal[1], offset]) / normal[2]
+    fitted_tiles = int(np.count_nonzero(~np.isnan(terrain[:, 0])))
+    if fitted_tiles == 0:
+        logger.warning("No ground plane found in any tile")
+        return np.zeros(len(xyz), dtype=bool)
     
-    # Filter
-    mask = mean_distances < threshold
-    filtered = points[mask]
+    mask = np.empty(len(xyz), dtype=bool)
     
-    logger.info(f"Outlier removal: {len(points)} -> {len(filtered)} points "
-                f"(threshold={threshold:.4f}m)")
-    return filtered
+    def label(start: int):
+        chunk = xyz[start:start + TRANSFORM_CHUNK_POINTS].astype(np.float64)
+        # Position in tile-centre units: cell (i, j) spans centres i..i+1, j..j+1
+        grid = (chunk[:, :2] - corner) / tile_size - 0.5
+        cell = np.floor(grid).astype(np.int64)
+        frac = grid - cell
+        height = np.zeros(len(chunk))
+        weight = np.zeros(len(chunk))
+        for di, dj in ((0, 0), (0, 1), (1, 0), (1, 1)):
+            i, j = cell[:, 0] + di, cell[:, 1] + dj
+            w = (frac[:, 0] if di else 1 - frac[:, 0]) * (frac[:, 1] if dj else 1 - frac[:, 1])
+            inside = (i >= 0) & (i < shape[0]) & (j >= 0) & (j < shape[1])
+            coefficients = np.full((len(chunk), 3), np.nan)
+            coefficients[inside] = terrain[i[inside] * shape[1] + j[inside]]
+            available = ~np.isnan(coefficients[:, 0])
+            w = np.where(available, w, 0.0)
+            height[available] += w[available] * (
+                coefficients[available, 0] * chunk[available, 0]
+                + coefficients[available, 1] * chunk[available, 1]
+                + coefficients[available, 2])
+            weight += w
+        # Renormalize over the tiles that have planes; points with none are not ground
+        with np.errstate(invalid='ignore', divide='ignore'):
+            residual = np.abs(chunk[:, 2] - height / weight)
+        mask[start:start + TRANSFORM_CHUNK_POINTS] = (weight > 0) & (residual < ground_threshold)
+    
+    for _ in map_ordered(label, range(0, len(xyz), TRANSFORM_CHUNK_POINTS), workers):
+        pass
+    
+    logger.info(f"Ground terrain: {fitted_tiles}/{tile_count} tiles of {tile_size}m fitted")
+    return mask
 
 
-def filter_ground_plane(
-    points: np.ndarray, 
+def segment_ground_tiles(
+    points: PointBatch | np.ndarray,
+    tile_size: float = 10.0,
+    overlap: float = 2.0,
     ground_threshold: float = 0.1,
-    ransac_iterations: int = 100
-) -> tuple[np.ndarray, np.ndarray]:
+    workers: int = 0,
+    seed: Optional[int] = 0
+) -> tuple[PointBatch | np.ndarray, PointBatch | np.ndarray]:
     """
-    Separate ground plane from other points using RANSAC.
+    Separate ground from other points with a piecewise-planar terrain model.
     
-    Args:
-        points: (N, 3) array of points
-        ground_threshold: Distance threshold for inliers
-        ransac_iterations: Number of RANSAC iterations
+    See ground_tile_mask for the model and the arguments.
     
     Returns:
-        Tuple of (non_ground_points, ground_points)
+        Tuple of (non_ground_points, ground_points), same type as the input
     """
-    if len(points) < 3:
-        return points, np.zeros((0, 3), dtype=np.float32)
-    
-    best_inliers = None
-    best_inlier_count = 0
-    
-    for _ in range(ransac_iterations):
-        # Sample 3 random points
-        indices = np.random.choice(len(points), 3, replace=False)
-        sample = points[indices]
-        
-        # Fit plane: ax + by + cz + d = 0
-        v1 = sample[1] - sample[0]
-        v2 = sample[2] - sample[0]
-        normal = np.cross(v1, v2)
-        
-        norm = np.linalg.norm(normal)
-        if norm < 1e-6:
-            continue
-        normal = normal / norm
-        
-        # Check if plane is approximately horizontal (normal ~ [0, 0, 1])
-        if abs(normal[2]) < 0.8:
-            continue
-        
-        d = -np.dot(normal, sample[0])
-        
-        # Compute distances to plane
-        distances = np.abs(np.dot(points, normal) + d)
-        
-        # Count inliers
-        inlier_mask = distances < ground_threshold
-        inlier_count = np.sum(inlier_mask)
-        
-        if inlier_count > best_inlier_count:
-            best_inlier_count = inlier_count
-            best_inliers = inlier_mask
+    mask = ground_tile_mask(point_xyz(points), tile_size, overlap, ground_threshold, workers, seed)
+    if not mask.any():
+        return points, points[:0]
     
-    if best_inliers is None:
-        logger.warning("No ground plane found")
-        return points, np.zeros((0, 3), dtype=np.float32)
+    ground_points = points[mask]
+    non_ground_points = points[~mask]
     
-    ground_points = points[best_inliers]
-    non_ground_points = points[~best_inliers]
-    
-    logger.info(f"Ground filtering: {len(ground_points)} ground, "
+    logger.info(f"Tiled ground filtering: {len(ground_points)} ground, "
                 f"{len(non_ground_points)} non-ground points")
     
     return non_ground_points, ground_points
 
 
+def ground_mask(
+    points: PointBatch | np.ndarray,
+    mode: str = 'plane',
+    ground_threshold: float = 0.1,
+    tile_size: float = 10.0
+) -> np.ndarray:
+    """
+    (N,) bool ground labels of points.
+    
+    Args:
+        points: PointBatch or (N, 3) array of points
+        mode: 'plane' (one global RANSAC plane, see ground_plane_mask) or
+            'tiled' (a piecewise terrain model, see ground_tile_mask)
+        ground_threshold: Distance from the ground model counted as ground
+        tile_size: Tile edge length of the tiled mode in meters
+    """
+    if mode not in GROUND_MODES:
+        raise ValueError(f"Unknown ground mode {mode!r}, expected one of {GROUND_MODES}")
+    if mode == 'tiled':
+        return ground_tile_mask(point_xyz(points), tile_size, ground_threshold=ground_threshold)
+    return ground_plane_mask(point_xyz(points), ground_threshold)
+
+
 def preprocess_point_cloud(
-    points: np.ndarray,
-    voxel_size: float = 0.05,
+    points: PointBatch | np.ndarray,
+    voxel_size: Optional[float] = 0.05,
     remove_outliers: bool = True,
-    filter_ground: bool = True
-) -> np.ndarray:
+    filter_ground: bool = True,
+    voxel_mode: str = 'first',
+    voxel_memory_budget: Optional[int] = None,
+    outlier_mode: str = 'statistical',
+    outlier_radius: float = 0.2,
+    outlier_min_neighbors: int = 8,
+    ground_mode: str = 'plane'
+) -> PointBatch | np.ndarray:
     """
     Full preprocessing pipeline for point cloud.
     
     Args:
-        points: Raw point cloud
-        voxel_size: Voxel size for downsampling
+        points: Raw point cloud (PointBatch attributes are carried along)
+        voxel_size: Voxel size for downsampling (None if already voxelized)
         remove_outliers: Whether to remove statistical outliers
         filter_ground: Whether to filter ground plane
+        voxel_mode: Point kept per voxel ('first', 'nearest' or 'centroid')
+        voxel_memory_budget: Voxelizing memory budget in bytes (see voxel_downsample)
+        outlier_mode: 'statistical' (k-nearest-neighbour distances) or
+            'radius' (neighbour counts, see remove_radius_outliers)
+        outlier_radius: Neighbourhood radius of the radius mode (and of the
+            statistical mode's fallback without scipy) in meters
+        outlier_min_neighbors: Neighbours the radius mode keeps a point with
+        ground_mode: 'plane' (one global RANSAC plane) or 'tiled' (a
+            piecewise terrain model, see segment_ground_tiles)
     
     Returns:
         Preprocessed point cloud
     """
+    if outlier_mode not in OUTLIER_MODES:
+        raise ValueError(f"Unknown outlier mode {outlier_mode!r}, expected one of {OUTLIER_MODES}")
+    if ground_mode not in GROUND_MODES:
+        raise ValueError(f"Unknown ground mode {ground_mode!r}, expected one of {GROUND_MODES}")
     if len(points) == 0:
         return points
     
     logger.info(f"Preprocessing {len(points)} points...")
     
     # Step 1: Voxel downsampling
-    points = voxel_downsample(points, voxel_size)
+    if voxel_size is not None:
+        points = voxel_downsample(points, voxel_size, voxel_mode, voxel_memory_budget)
     
     # Step 2: Remove outliers
     if remove_outliers and len(points) > 50:
-        points = remove_statistical_outliers(points)
+        if outlier_mode == 'radius':
+            points = remove_radius_outliers(points, outlier_radius, outlier_min_neighbors)
+        else:
+            points = remove_statistical_outliers(
+                points,
+                fallback_radius=outlier_radius,
+                fallback_min_neighbors=outlier_min_neighbors
+            )
     
     # Step 3: Ground filtering (optional, depends on use case)
     if filter_ground and len(points) > 100:
-        non_ground, ground = filter_ground_plane(points)
+        ground_count = int(np.count_nonzero(ground_mask(points, ground_mode)))
+        logger.info(f"Ground filtering: {ground_count} ground, "
+                    f"{len(points) - ground_count} non-ground points")
         # For splatting, we might want to keep ground
         # but we can return both if needed
         # For now, keep all points but log the separation
@@ -525,15 +3813,22 @@ def preprocess_point_cloud(
 
 
 def run_gaussian_splatting(
-    points: np.ndarray,
+    points: PointBatch | np.ndarray,
     poses: list[dict],
     images: list[Path],
     output_path: Path,
-    config: SplatConfig
+    config: SplatConfig,
+    origin: Optional[np.ndarray] = None,
+    voxelized: bool = False
 ) -> dict:
     """
     Run Gaussian splatting training.
     
+    Points and poses are in the session's local frame; origin (its world
+    position) is recorded in the stats and the PLY header. voxelized
+    skips the voxel downsample for points that were voxelized while
+    loading (see stream_session_data).
+    
     This is a simplified implementation. For production, you would:
     1. Use COLMAP or similar for proper camera pose estimation
     2. Train using gsplat or nerfstudio
@@ -551,6 +3846,8 @@ def run_gaussian_splatting(
         'iterations': config.iterations,
         'status': 'pending'
     }
+    if origin is not None:
+        stats['origin'] = np.asarray(origin).tolist()
     
     try:
         # Preprocess point cloud
@@ -558,13 +3855,26 @@ def run_gaussian_splatting(
             original_count = len(points)
             points = preprocess_point_cloud(
                 points,
-                voxel_size=0.05,  # 5cm voxels
-                remove_outliers=True,
-                filter_ground=False  # Keep ground for splatting
+                voxel_size=None if voxelized else config.voxel_size,
+                # Already done per frame when the range-image filter is on
+                remove_outliers=not config.range_image_filter,
+                filter_ground=False,  # Keep ground for splatting
+                voxel_mode=config.voxel_mode,
+                voxel_memory_budget=config.voxel_memory_mb * 1024 ** 2 or None,
+                outlier_mode=config.outlier_mode,
+                outlier_radius=config.outlier_radius,
+                outlier_min_neighbors=config.outlier_min_neighbors
             )
             stats['preprocessed_points'] = len(points)
             logger.info(f"Preprocessed: {original_count} -> {len(points)} points")
         
+        # Label ground, keeping it for splatting
+        ground = None
+        if config.ground_mode is not None and len(points) > 100:
+            ground = ground_mask(points, config.ground_mode, tile_size=config.ground_tile_size)
+            stats['ground_points'] = int(np.count_nonzero(ground))
+            logger.info(f"Ground labels: {stats['ground_points']}/{len(points)} points")
+        
         # Check if we have enough data
         if len(points) < 100:
             logger.warning("Insufficient points for splatting, creating point cloud only")
@@ -573,7 +3883,7 @@ def run_gaussian_splatting(
             
             # Just save the point cloud as PLY
             if len(points) > 0:
-                save_points_as_ply(points, output_path / 'splat.ply')
+                save_points_as_ply(points, output_path / 'splat.ply', origin=origin, ground=ground)
                 stats['output_points'] = len(points)
                 stats['status'] = 'point_cloud_only'
             
@@ -588,16 +3898,16 @@ def run_gaussian_splatting(
         # For now, we'll create a colored point cloud from LiDAR
         # This demonstrates the pipeline without requiring full GPU training
         
-        if HAS_GSPLAT:
+        if gsplat_available():
             # Full Gaussian splatting training
-            gaussians = train_gaussians(points, poses, images, config)
-            export_gaussians_to_ply(gaussians, output_path / 'splat.ply')
+            gaussians = train_gaussians(point_xyz(points), poses, images, config)
+            export_gaussians_to_ply(gaussians, output_path / 'splat.ply', origin=origin)
             stats['output_gaussians'] = len(gaussians)
             stats['status'] = 'success'
         else:
             # Fallback: create point cloud
             logger.info("gsplat not available, creating point cloud")
-            save_points_as_ply(points, output_path / 'splat.ply')
+            save_points_as_ply(points, output_path / 'splat.ply', origin=origin, ground=ground)
             stats['output_points'] = len(points)
             stats['status'] = 'point_cloud_only'
             stats['message'] = 'gsplat not available, exported point cloud'
@@ -611,15 +3921,22 @@ def run_gaussian_splatting(
     return stats
 
 
-# Check if gsplat is available
-try:
-    import torch
-    import gsplat
-    HAS_GSPLAT = True
+@lru_cache(maxsize=None)
+def gsplat_available() -> bool:
+    """
+    Check if gsplat is available, once per process.
+
+    Not done at import: spawned preprocessing workers (see
+    segment_ground_tiles) import this module and never train.
+    """
+    try:
+        import torch
+        import gsplat
+    except ImportError:
+        logger.warning("gsplat not available, will use point cloud fallback")
+        return False
     logger.info(f"gsplat available, CUDA: {torch.cuda.is_available()}")
-except ImportError:
-    HAS_GSPLAT = False
-    logger.warning("gsplat not available, will use point cloud fallback")
+    return True
 
 
 def train_gaussians(
@@ -697,14 +4014,27 @@ def train_gaussians(
     return gaussians
 
 
-def export_gaussians_to_ply(gaussians: np.ndarray, path: Path):
-    """Export Gaussians to PLY format for viewing with splat viewers."""
+def ply_origin_comment(origin: Optional[np.ndarray]) -> str:
+    """PLY header line recording the local origin (empty if None)."""
+    if origin is None:
+        return ''
+    x, y, z = np.asarray(origin, dtype=np.float64)
+    return f"comment origin {x:.6f} {y:.6f} {z:.6f}\n"
+
+
+def export_gaussians_to_ply(gaussians: np.ndarray, path: Path, origin: Optional[np.ndarray] = None):
+    """
+    Export Gaussians to PLY format for viewing with splat viewers.
+
+    Positions are relative to origin, which is recorded as a
+    "comment origin x y z" header line.
+    """
     logger.info(f"Exporting {len(gaussians)} Gaussians to {path}")
     
     # PLY header for Gaussian splat format
     header = f"""ply
 format binary_little_endian 1.0
-element vertex {len(gaussians)}
+{ply_origin_comment(origin)}element vertex {len(gaussians)}
 property float x
 property float y
 property float z
@@ -729,23 +4059,65 @@ end_header
     logger.info(f"Wrote {path}")
 
 
-def save_points_as_ply(points: np.ndarray, path: Path):
-    """Save points as a simple PLY file."""
+def intensity_to_grey(intensity: np.ndarray) -> np.ndarray:
+    """Map LiDAR intensity to 0-255 grey, scaled to the 99th percentile."""
+    if len(intensity) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    scale = np.percentile(intensity, 99)
+    if scale <= 0:
+        return np.zeros(len(intensity), dtype=np.uint8)
+    return (np.clip(intensity / scale, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+def save_points_as_ply(
+    points: PointBatch | np.ndarray,
+    path: Path,
+    chunk_size: int = 1_000_000,
+    origin: Optional[np.ndarray] = None,
+    ground: Optional[np.ndarray] = None
+):
+    """
+    Save points as a simple PLY file.
+
+    Intensity, when present, is written both as a property and as a grey
+    vertex colour so viewers show the fallback cloud shaded. Ground labels,
+    when given, are written as a 0/1 "ground" property. Positions are
+    relative to origin, recorded as a "comment origin x y z" header line.
+    """
     logger.info(f"Saving {len(points)} points to {path}")
     
+    xyz = point_xyz(points)
+    intensity = points.intensity if isinstance(points, PointBatch) else None
+    
+    properties = ['x', 'y', 'z']
+    fmt = ['%.6f'] * 3
+    if intensity is not None:
+        grey = intensity_to_grey(intensity)
+        properties += ['intensity']
+        fmt += ['%g']
+    
     header = f"""ply
 format ascii 1.0
-element vertex {len(points)}
-property float x
-property float y
-property float z
-end_header
-"""
+{ply_origin_comment(origin)}element vertex {len(points)}
+""" + ''.join(f"property float {name}\n" for name in properties)
+    if intensity is not None:
+        header += "property uchar red\nproperty uchar green\nproperty uchar blue\n"
+        fmt += ['%d'] * 3
+    if ground is not None:
+        header += "property uchar ground\n"
+        fmt += ['%d']
+    header += "end_header\n"
     
     with open(path, 'w') as f:
         f.write(header)
-        for p in points:
-            f.write(f"{p[0]:.6f} {p[1]:.6f} {p[2]:.6f}\n")
+        for start in range(0, len(points), chunk_size):
+            end = min(start + chunk_size, len(points))
+            columns = [xyz[start:end]]
+            if intensity is not None:
+                columns += [intensity[start:end, None], np.repeat(grey[start:end, None], 3, axis=1)]
+            if ground is not None:
+                columns += [ground[start:end, None]]
+            np.savetxt(f, np.hstack(columns), fmt=fmt)
     
     logger.info(f"Wrote {path}")
 
@@ -761,14 +4133,60 @@ def process_job(job_path: Path):
         job = Job.from_json(data)
         logger.info(f"Job {job.id}: session={job.session_path}, output={job.output_path}")
         
-        # Load session data
-        points, poses, images = load_session_data(job.session_path)
+        # Size the session from headers (or its pack) before paying for the full load
+        pack = open_session_pack(job.session_path)
+        manifest = pack.manifest if pack is not None else scan_session(job.session_path)
+        logger.info(f"Job {job.id}: {manifest.lidar_frames} LiDAR frames, "
+                    f"{manifest.total_points} points (~{manifest.estimated_bytes / 1e6:.0f} MB), "
+                    f"pose coverage {manifest.pose_coverage:.0%}, "
+                    f"{manifest.camera_frames} camera frames")
         
-        # Run splatting
-        stats = run_gaussian_splatting(
-            points, poses, images,
-            job.output_path, job.config
-        )
+        rejection = manifest.rejection_reason()
+        if rejection is not None:
+            logger.warning(f"Job {job.id} rejected: {rejection}")
+            stats = {'status': 'failed', 'error': rejection}
+        else:
+            # First sight of this session: pack it so re-runs skip the PCDs
+            if pack is None:
+                try:
+                    write_session_pack(
+                        job.session_path, codec=PACK_CODEC,
+                        workers=job.config.load_workers
+                    )
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not pack session {job.session_path}: {e}")
+            
+            # Load session data; sessions too large to hold raw are
+            # voxelized frame by frame as they load
+            session_options = dict(
+                workers=job.config.load_workers,
+                deskew=job.config.deskew,
+                origin=job.config.origin,
+                min_translation=job.config.min_frame_translation,
+                min_rotation=job.config.min_frame_rotation,
+                crop=SensorCrop.from_config(job.config),
+                range_filter=RangeImageFilter.from_config(job.config)
+            )
+            streamed = manifest.estimated_bytes > STREAM_THRESHOLD_BYTES
+            if streamed:
+                points, poses, images, origin = stream_session_data(
+                    job.session_path,
+                    voxel_size=job.config.voxel_size,
+                    voxel_mode=job.config.voxel_mode,
+                    memory_budget=job.config.voxel_memory_mb * 1024 ** 2 or None,
+                    **session_options
+                )
+            else:
+                points, poses, images, origin = load_session_data(job.session_path, **session_options)
+            
+            # Run splatting
+            stats = run_gaussian_splatting(
+                points, poses, images,
+                job.output_path, job.config,
+                origin=origin,
+                voxelized=streamed
+            )
+        stats['manifest'] = manifest.to_dict()
         
         # Write result
         result = {
@@ -778,16 +4196,17 @@ def process_job(job_path: Path):
             'stats': stats
         }
         
+        job.output_path.mkdir(parents=True, exist_ok=True)
         result_path = job.output_path / 'result.json'
         with open(result_path, 'w') as f:
             json.dump(result, f, indent=2)
         
         logger.info(f"Job {job.id} completed with status: {stats['status']}")
         
-        # Move job file to processed
-        processed_dir = job_path.parent / 'processed'
-        processed_dir.mkdir(exist_ok=True)
-        shutil.move(str(job_path), str(processed_dir / job_path.name))
+        # Move job file to processed (or failed if the session was rejected)
+        done_dir = job_path.parent / ('failed' if rejection else 'processed')
+        done_dir.mkdir(exist_ok=True)
+        shutil.move(str(job_path), str(done_dir / job_path.name))
         
     except Exception as e:
         logger.error(f"Failed to process job {job_path}: {e}")
@@ -818,6 +4237,8 @@ def main():
     logger.info(f"Jobs directory: {JOBS_DIR}")
     logger.info(f"Maps directory: {MAPS_DIR}")
     logger.info(f"Sessions directory: {SESSIONS_DIR}")
+    logger.info(f"Session packs directory: {PACKS_DIR}")
+    gsplat_available()
     
     # Ensure directories exist
     JOBS_DIR.mkdir(parents=True, exist_ok=True)